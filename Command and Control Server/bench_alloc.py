@@ -0,0 +1,83 @@
+"""
+bench_alloc.py
+Allocation check for the red-mask pipeline (tracemalloc).
+
+Runs the allocating red_mask() and the buffer-reusing FramePipeline (single
+mask, and masks() over a LabelLUT) over the same frames and reports, per
+path, the per-frame allocation peak (worst and mean), the net traced-memory
+growth between the end of warm-up and the last frame, and the untraced time
+per frame. red_mask allocates several image planes per frame; the
+pipelines must stay below --limit bytes on every frame (small Python
+objects only, no image memory), otherwise the script exits with status 1.
+
+    python bench_alloc.py                 # 10k frames at 640x480
+    python bench_alloc.py --frames 2000 --size 1280x720
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from bench_pyramid import synthetic_frames
+from color_lut import LabelLUT
+from detection import PROFILES, red_mask
+from pipeline import FramePipeline
+
+
+def measure(mask_fn, frames, n, warmup=100):
+    for i in range(warmup):
+        mask_fn(frames[i % len(frames)])
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        mask_fn(frames[i % len(frames)])
+    per_frame = (time.perf_counter() - t0) / n
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    peaks = np.empty(n, np.int64)
+    for i in range(n):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        mask_fn(frames[i % len(frames)])
+        peaks[i] = tracemalloc.get_traced_memory()[1] - before
+    growth = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return peaks, growth, per_frame
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=10000)
+    ap.add_argument("--size", default="640x480", help="frame size WxH")
+    ap.add_argument("--limit", type=int, default=16384, help="max bytes a pipeline may allocate per frame")
+    args = ap.parse_args()
+
+    w, h = (int(v) for v in args.size.split("x"))
+    frames = synthetic_frames(50, w, h)
+    red_mask(frames[0])  # warm up outside the measurement
+
+    pipeline = FramePipeline()
+    labels = FramePipeline(LabelLUT({name: PROFILES[name] for name in ("red", "green", "blue")}))
+    paths = (("red_mask (allocating)", red_mask, None),
+             ("FramePipeline", pipeline, args.limit),
+             ("FramePipeline.masks", labels.masks, args.limit))
+    print(f"{args.frames} frames {w}x{h}, per-frame allocation peak")
+    failed = False
+    for name, fn, limit in paths:
+        peaks, growth, per_frame = measure(fn, frames, args.frames)
+        over = int((peaks > limit).sum()) if limit is not None else 0
+        failed |= over > 0
+        print(f"{name:22s} worst {peaks.max():>10,d} B   mean {peaks.mean():>10,.0f} B   "
+              f"net growth {growth:>8,d} B   {per_frame * 1000:.3f} ms/frame"
+              + (f"   {over} frames over {limit:,d} B" if over else ""))
+    print(f"buffer allocations: {pipeline.allocations} + {labels.allocations} (all during warm-up)")
+    if failed:
+        sys.exit(f"FAIL: a pipeline allocated more than {args.limit:,d} B in a frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+bench_presets.py
+Accuracy vs speed of the red detector presets, in one table.
+
+The trackers grew three red pipelines with their own thresholds and
+cleanup. Each is rebuilt here from color_profiles.json exactly as its
+script runs it (the scripts themselves open a camera on import):
+
+    redTracker     red_tracker profile, blur 7x7, close+open, area > 500, RoiTracker
+    newguibrain    red profile, blur 7x7, close+open, area > 300 (detection.detect_red)
+    modifyred      red_strict profile, no blur, open+dilate, area > 500
+    pyramid        detect_red on a half-size frame, refined at full size
+    lockon         LockOnTracker: full detection every 10 frames, CamShift between
+
+Every preset sees the same frames (read into memory first, so decoding is
+not timed) and only the detector call is timed. With ground truth a
+detection counts as a hit when its centroid lies inside a visible target's
+bbox (+ TOLERANCE px) and as a false positive when it is on no target at
+all (a target whose center has left the frame is not scored either way);
+the centroid error is measured against the hit target's true center.
+
+    python bench_presets.py                          # built-in synthetic datasets
+    python bench_presets.py clip.mp4 synth:1280x720?decoys=2 exits
+    python bench_presets.py --preset newguibrain --preset modifyred
+    python bench_presets.py --backend mine=my_detector:detect
+
+Datasets are source URIs (see sources.py). Synthetic sources carry their
+own ground truth; for recordings put a CSV next to the file (clip.mp4 ->
+clip.truth.csv) with the header `frame,x,y,w,h`: the target bbox per frame
+(0-based read order, frames without a row have no target in view). Without
+truth only the speed and found columns are filled. A --backend is any
+function with detect_red's signature, (frame, frame_id, t_capture) -> Detection.
+"""
+
+import argparse
+import csv
+import importlib
+import os
+import time
+
+import cv2
+import numpy as np
+
+from color_lut import ColorLUT, load_profiles
+from detection import Detection, detect_red, detect_red_pyramid, largest_blob
+from lockon import LockOnTracker
+from sources import SyntheticSource, open_source
+from tracking import RoiTracker
+
+TOLERANCE = 4                         # px around a target bbox that still counts as a hit
+WARMUP = 10                           # untimed frames per preset (warm-up, allocations)
+KERNEL = np.ones((5, 5), np.uint8)
+
+
+def tracker_mask(lut):
+    def mask_fn(frame):
+        mask = lut.mask(cv2.GaussianBlur(frame, (7, 7), 0))
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, KERNEL)
+        return cv2.morphologyEx(mask, cv2.MORPH_OPEN, KERNEL)
+    return mask_fn
+
+
+def strict_detector(lut):
+    def detect(frame, frame_id=0, t_capture=None):
+        det = Detection(frame_id, t_capture or time.perf_counter())
+        mask = cv2.morphologyEx(lut.mask(frame), cv2.MORPH_OPEN, KERNEL)
+        largest_blob(cv2.morphologyEx(mask, cv2.MORPH_DILATE, KERNEL), det, min_area=500)
+        det.t_done = time.perf_counter()
+        return det
+    return detect
+
+
+# name -> factory of a fresh detector (trackers keep state between frames)
+PRESETS = {
+    "redTracker": lambda: RoiTracker(mask_fn=tracker_mask(ColorLUT(load_profiles()["red_tracker"])),
+                                     min_area=500).update,
+    "newguibrain": lambda: detect_red,
+    "modifyred": lambda: strict_detector(ColorLUT(load_profiles()["red_strict"])),
+    "pyramid": lambda: detect_red_pyramid,
+    "lockon": lambda: LockOnTracker(RoiTracker()).update,
+}
+
+
+def default_datasets(frames):
+    base = f"synth:640x480?fast&frames={frames}"
+    return {
+        "single": f"{base}&path=bounce",
+        "decoys": f"{base}&path=bounce&decoys=2",
+        "fast": f"{base}&path=bounce&speed=20",
+        "noisy": f"{base}&noise=14",
+        "exits": f"{base}&path=linear&speed=6",   # target leaves the frame, then only false positives
+    }
+
+
+def load_backend(spec):
+    """NAME=module:function -> (NAME, factory)."""
+    name, _, target = spec.rpartition("=")
+    module, _, func = target.partition(":")
+    fn = getattr(importlib.import_module(module), func)
+    return name or func, lambda: fn
+
+
+def read_truth(path):
+    """CSV frame,x,y,w,h -> {frame: (centroid (1, 2), bbox (1, 4), visible (1,))}."""
+    truth = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            x, y, w, h = (float(row[k]) for k in "xywh")
+            truth[int(row["frame"])] = (np.array([[x + w / 2, y + h / 2]]), np.array([[x, y, w, h]]),
+                                        np.array([True]))
+    return truth
+
+
+def load_dataset(uri, frames):
+    """Read up to `frames` frames of a source, with per-frame truth or None."""
+    src = open_source(uri, realtime=False)
+    truth_csv = os.path.splitext(str(uri).partition("?")[0])[0] + ".truth.csv"
+    table = read_truth(truth_csv) if os.path.isfile(truth_csv) else None
+    no_target = (np.zeros((0, 2)), np.zeros((0, 4)), np.zeros(0, bool))
+    data, truths = [], []
+    while len(data) < frames:
+        ok, frame = src.read()
+        if not ok:
+            break
+        data.append(frame)
+        if isinstance(src, SyntheticSource):
+            truths.append((src.truth.centroid, src.truth.bbox, src.truth.visible))
+        elif table is not None:
+            truths.append(table.get(len(data) - 1, no_target))
+    src.release()
+    return data, truths or None
+
+
+def score(det, truth):
+    """'hit' with the centroid error, 'fp', 'miss' or None (nothing to score)."""
+    centroid, bbox, visible = truth
+    if not det.found:
+        return ("miss" if visible.any() else None), None
+    for (tx, ty), (x, y, w, h), v in zip(centroid, bbox, visible):
+        if x - TOLERANCE <= det.cx <= x + w + TOLERANCE and y - TOLERANCE <= det.cy <= y + h + TOLERANCE:
+            # a target with its center outside the frame is neither required nor a false positive
+            return ("hit", float(np.hypot(det.cx - tx, det.cy - ty))) if v else (None, None)
+    return "fp", None
+
+
+def run(factory, frames, truths):
+    detector = factory()
+    for i, frame in enumerate(frames[:WARMUP]):
+        detector(frame, i)
+    detector = factory()                      # trackers start over for the timed pass
+
+    times, results = [], []
+    for i, frame in enumerate(frames):
+        t0 = time.perf_counter()
+        det = detector(frame, i, t0)
+        times.append(time.perf_counter() - t0)
+        results.append(det)
+
+    times = np.array(times) * 1000
+    row = {
+        "fps": 1000 * len(times) / times.sum(),
+        "p50": np.percentile(times, 50),
+        "p99": np.percentile(times, 99),
+        "found": 100 * np.mean([d.found for d in results]),
+    }
+    if truths is not None:
+        outcomes = [score(d, t) for d, t in zip(results, truths)]
+        with_target = sum(t[2].any() for t in truths)
+        hits = [err for kind, err in outcomes if kind == "hit"]
+        row["det"] = 100 * len(hits) / with_target if with_target else float("nan")
+        row["fp"] = 100 * sum(kind == "fp" for kind, _ in outcomes) / len(outcomes)
+        if hits:
+            row["err"] = np.mean(hits)
+            row["err95"] = np.percentile(hits, 95)
+    return row
+
+
+COLUMNS = (("fps", "fps", "{:7.0f}"), ("p50", "p50 ms", "{:7.2f}"), ("p99", "p99 ms", "{:7.2f}"),
+           ("found", "found%", "{:7.1f}"), ("det", "det%", "{:7.1f}"), ("fp", "fp%", "{:7.1f}"),
+           ("err", "err px", "{:7.2f}"), ("err95", "err95", "{:7.2f}"))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("datasets", nargs="*", help="source URIs or built-in dataset names (default: all built-in)")
+    ap.add_argument("--frames", type=int, default=300, help="frames per dataset")
+    ap.add_argument("--preset", action="append", choices=sorted(PRESETS),
+                    help="only these presets (repeatable)")
+    ap.add_argument("--backend", action="append", default=[], metavar="NAME=MODULE:FUNC",
+                    help="extra detector to compare (repeatable)")
+    args = ap.parse_args()
+
+    presets = {name: PRESETS[name] for name in (args.preset or PRESETS)}
+    presets.update(load_backend(spec) for spec in args.backend)
+    builtin = default_datasets(args.frames)
+    datasets = {os.path.basename(uri.partition("?")[0]) or uri: builtin.get(uri, uri)
+                for uri in args.datasets} or builtin
+
+    width, dwidth = max(map(len, presets)), max(7, *map(len, datasets))
+    print(f"{'preset':<{width}s} {'dataset':<{dwidth}s}" + "".join(f" {title:>7s}" for _, title, _ in COLUMNS))
+    for label, uri in datasets.items():
+        frames, truths = load_dataset(uri, args.frames)
+        if not frames:
+            print(f"{label}: no frames")
+            continue
+        for name, factory in presets.items():
+            row = run(factory, frames, truths)
+            cells = "".join(" " + (fmt.format(row[key]) if key in row else f"{'-':>7s}")
+                            for key, _, fmt in COLUMNS)
+            print(f"{name:<{width}s} {label:<{dwidth}s}{cells}")
+        h, w = frames[0].shape[:2]
+        print(f"{'':<{width}s} ({len(frames)} frames {w}x{h}{'' if truths else ', no ground truth'})")
+
+
+if __name__ == "__main__":
+    main()
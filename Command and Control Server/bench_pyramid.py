@@ -0,0 +1,92 @@
+"""
+bench_pyramid.py
+Full-resolution vs coarse-to-fine (pyramid) red detection.
+
+Runs detect_red and detect_red_pyramid on the same frames and reports the
+time per frame, the speedup and the centroid error of the pyramid path
+against the full-resolution one.
+
+    python bench_pyramid.py                      # synthetic 640x480 scene
+    python bench_pyramid.py --video clip.mp4     # recorded footage
+    python bench_pyramid.py --scale 4 --size 1280x720
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from detection import detect_red, detect_red_pyramid
+from scenes import synthetic_background
+
+
+def synthetic_frames(n, w, h, seed=0):
+    """Red disc moving over a noisy, cluttered background."""
+    background = synthetic_background(w, h, seed)
+    frames = []
+    for i in range(n):
+        frame = background.copy()
+        t = i / n * 2 * np.pi
+        cx, cy = int(w / 2 + w / 3 * np.cos(t)), int(h / 2 + h / 3 * np.sin(2 * t))
+        cv2.circle(frame, (cx, cy), max(12, w // 30), (30, 30, 220), -1)
+        frames.append(frame)
+    return frames
+
+
+def video_frames(path, n):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < n:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def timed(fn, frames):
+    results = []
+    t0 = time.perf_counter()
+    for frame in frames:
+        results.append(fn(frame))
+    return results, (time.perf_counter() - t0) / len(frames)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    ap.add_argument("--video", help="video file instead of the synthetic scene")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--size", default="640x480", help="synthetic frame size WxH")
+    ap.add_argument("--scale", type=int, default=2, help="pyramid downscale per side")
+    args = ap.parse_args()
+
+    if args.video:
+        frames = video_frames(args.video, args.frames)
+    else:
+        w, h = (int(v) for v in args.size.split("x"))
+        frames = synthetic_frames(args.frames, w, h)
+    if not frames:
+        raise SystemExit("no frames to benchmark")
+
+    timed(detect_red, frames[:10])  # warm up OpenCV
+    full, t_full = timed(detect_red, frames)
+    pyr, t_pyr = timed(lambda f: detect_red_pyramid(f, scale=args.scale), frames)
+
+    errors = [np.hypot(a.cx - b.cx, a.cy - b.cy)
+              for a, b in zip(full, pyr) if a.found and b.found]
+    agree = sum(a.found == b.found for a, b in zip(full, pyr))
+
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frames {w}x{h}, pyramid scale 1/{args.scale}")
+    print(f"full-res : {t_full * 1000:7.3f} ms/frame")
+    print(f"pyramid  : {t_pyr * 1000:7.3f} ms/frame   speedup x{t_full / t_pyr:.2f}")
+    print(f"found-state agreement: {agree}/{len(frames)}")
+    if errors:
+        print(f"centroid error vs full-res: mean {np.mean(errors):.2f} px, "
+              f"max {np.max(errors):.2f} px")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+blobs.py
+Interchangeable blob-detector backends for a cleaned binary mask.
+
+Every backend has the signature of detection.largest_blob:
+backend(mask, det, min_area) fills `det` with the largest blob above
+`min_area` (centroid, bbox, area) and returns it.
+
+    contours    findContours + contourArea loop + moments (the original path,
+                also provides the outline for overlays)
+    components  connectedComponentsWithStats: area, bbox and centroid of
+                every blob in one C call
+    moments     moments of the whole mask; every foreground pixel is assumed
+                to belong to the target, so two objects give a centroid
+                between them. Never selected automatically, opt in only
+                when a single red object can be in view
+
+select_backend() times the backends on synthetic masks of the given
+resolution and blob count and returns the fastest. Run this file to print
+the timing table:
+
+    python blobs.py
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from detection import MIN_AREA, largest_blob
+
+contour_blob = largest_blob
+
+
+def component_blob(mask, det, min_area=MIN_AREA):
+    n, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if n < 2:
+        return det
+    areas = stats[1:, cv2.CC_STAT_AREA]   # label 0 is the background
+    i = int(np.argmax(areas))
+    if areas[i] <= min_area:
+        return det
+    x, y, w, h = (int(v) for v in stats[i + 1, :4])
+    det.cx, det.cy = int(centroids[i + 1, 0]), int(centroids[i + 1, 1])
+    det.bbox = (x, y, w, h)
+    det.area = float(areas[i])
+    return det
+
+
+def moments_blob(mask, det, min_area=MIN_AREA):
+    M = cv2.moments(mask, binaryImage=True)
+    if M["m00"] <= min_area:
+        return det
+    det.cx = int(M["m10"] / M["m00"])
+    det.cy = int(M["m01"] / M["m00"])
+    det.bbox = cv2.boundingRect(mask)
+    det.area = M["m00"]
+    return det
+
+
+def blob_arrays(mask, min_area=MIN_AREA):
+    """Every blob above `min_area` as arrays, no Python loop per blob.
+
+    Returns centroids (N, 2) float, bboxes (N, 4) int (x, y, w, h) and areas (N,) float.
+    """
+    _, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    keep = np.flatnonzero(stats[1:, cv2.CC_STAT_AREA] > min_area) + 1
+    return centroids[keep], stats[keep, :4], stats[keep, cv2.CC_STAT_AREA].astype(float)
+
+
+BACKENDS = {
+    "contours": contour_blob,
+    "components": component_blob,
+    "moments": moments_blob,
+}
+
+
+def synthetic_masks(shape, blob_count, n=8, seed=0):
+    """Binary masks with `blob_count` filled discs of 15-40 px radius."""
+    rng = np.random.default_rng(seed)
+    h, w = shape
+    masks = []
+    for _ in range(n):
+        mask = np.zeros((h, w), np.uint8)
+        for _ in range(blob_count):
+            r = int(rng.integers(15, 41))
+            cv2.circle(mask, (int(rng.integers(r, w - r)), int(rng.integers(r, h - r))),
+                       r, 255, -1)
+        masks.append(mask)
+    return masks
+
+
+def benchmark(shape, blob_count, backends=None, repeats=20):
+    """Mean ms per mask for each backend."""
+    from detection import Detection
+    backends = backends or BACKENDS
+    masks = synthetic_masks(shape, blob_count)
+    timings = {}
+    for name, fn in backends.items():
+        fn(masks[0], Detection(0, 0.0))   # warm up
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            for mask in masks:
+                fn(mask, Detection(0, 0.0))
+        timings[name] = (time.perf_counter() - t0) * 1000 / (repeats * len(masks))
+    return timings
+
+
+def select_backend(shape, blob_count=1, single_target=False):
+    """Name of the fastest backend for masks of `shape` with `blob_count` blobs.
+
+    The moments backend is only considered with single_target=True, meaning
+    at most one red object in view (not just "steer on the largest blob").
+    """
+    candidates = {k: v for k, v in BACKENDS.items() if single_target or k != "moments"}
+    timings = benchmark(shape, max(1, blob_count), candidates)
+    return min(timings, key=timings.get), timings
+
+
+def main():
+    print(f"{'resolution':>10s} {'blobs':>5s}" + "".join(f"{k:>12s}" for k in BACKENDS) + "  fastest")
+    for shape in ((240, 320), (480, 640), (720, 1280)):
+        for blob_count in (1, 5, 50):
+            timings = benchmark(shape, blob_count)
+            best = min(timings, key=timings.get)
+            row = "".join(f"{timings[k]:10.3f}ms" for k in BACKENDS)
+            print(f"{shape[1]:>5d}x{shape[0]:<4d} {blob_count:>5d}{row}  {best}")
+    print("(moments is only valid in single-target mode)")
+
+
+if __name__ == "__main__":
+    main()
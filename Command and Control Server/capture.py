@@ -0,0 +1,266 @@
+"""
+capture.py
+Threaded camera capture with a latest-frame mailbox.
+
+The grabber thread owns the video source (sources.py: a camera, a file, an
+image directory or a synthetic scene) and reads as fast as it delivers. Only the newest frame is kept: if the consumer has not picked up
+the previous one it is dropped, so the tracker always works on the freshest
+image and the GUI thread never blocks on camera I/O.
+
+A CaptureProfile asks the backend for resolution, fps, fourcc and driver
+buffer size, and reads every property back: backends silently ignore what
+they can't do, so the negotiated values are what the grabber reports and
+uses. LOW_LATENCY keeps a single driver buffer and MJPG (USB cameras
+deliver uncompressed frames at a fraction of the MJPG rate).
+
+Capture latency (exposure/driver timestamp -> frame available to the
+tracker) is measured two ways:
+
+    timestamps  V4L2 stamps each buffer with CLOCK_MONOTONIC; the grabber
+                compares it with time.monotonic() after every read
+    buffering   probe_buffering() pauses, then times back-to-back reads;
+                reads that return at once were sitting in the driver queue
+
+    python capture.py --src 0                     # default vs low-latency profile
+    python capture.py --src 0 --size 1280x720 --fps 30
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from collections import deque, namedtuple
+from dataclasses import dataclass
+
+import cv2
+
+from sources import open_source
+
+# A frame handed to consumers. frame_id increases by one per captured frame,
+# t_capture is time.perf_counter() taken right after the read returned.
+Frame = namedtuple("Frame", "frame_id t_capture image")
+
+
+@dataclass
+class CaptureProfile:
+    width: int = 640
+    height: int = 480
+    fps: float = None                 # None: backend default
+    fourcc: str = None                # e.g. "MJPG", "YUYV"; None: backend default
+    buffer_size: int = None           # driver queue length; None: backend default
+
+    def apply(self, cap):
+        """Request the profile on an open capture, return {prop: (requested, actual)}."""
+        requested = {"fourcc": self.fourcc, "width": self.width, "height": self.height,
+                     "fps": self.fps, "buffer_size": self.buffer_size}
+        # fourcc first: the resolutions and rates on offer depend on the format
+        if self.fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            cap.set(cv2.CAP_PROP_FPS, self.fps)
+        if self.buffer_size:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        return {k: (v, read_back(cap, k)) for k, v in requested.items()}
+
+
+PROFILES = {
+    "default": CaptureProfile(),
+    "low_latency": CaptureProfile(fps=60, fourcc="MJPG", buffer_size=1),
+}
+
+_PROPS = {"width": cv2.CAP_PROP_FRAME_WIDTH, "height": cv2.CAP_PROP_FRAME_HEIGHT,
+          "fps": cv2.CAP_PROP_FPS, "buffer_size": cv2.CAP_PROP_BUFFERSIZE}
+
+
+def read_back(cap, prop):
+    if prop == "fourcc":
+        code = int(cap.get(cv2.CAP_PROP_FOURCC))
+        return "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)) if code > 0 else None
+    value = cap.get(_PROPS[prop])
+    if value <= 0:
+        return None                   # not reported by this backend
+    return value if prop == "fps" else int(value)
+
+
+def mismatches(negotiated):
+    """Props the backend did not grant, as "prop: requested -> actual" strings."""
+    out = []
+    for prop, (want, got) in negotiated.items():
+        if want is None:
+            continue
+        if prop == "fps" and got is not None and abs(got - want) < 0.5:
+            continue
+        if want != got:
+            out.append(f"{prop}: {want} -> {got}")
+    return out
+
+
+def frame_age(cap):
+    """Seconds since the driver stamped the frame just read, None if it has no usable stamp."""
+    stamp = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if stamp <= 0:
+        return None
+    age = time.monotonic() - stamp / 1000
+    # files and some backends report stream position, not a monotonic clock
+    return age if 0 <= age < 1.0 else None
+
+
+def probe_buffering(cap, period, reads=8):
+    """Frames queued in the driver and their age, from the timing of back-to-back reads.
+
+    Pauses for `reads` frame periods so the queue fills, then reads
+    continuously. Reads that return in under a quarter period did not wait
+    for the camera. Returns (buffered frames, age of the first one in s).
+    """
+    time.sleep(reads * period)
+    buffered = 0
+    for _ in range(reads):
+        t0 = time.perf_counter()
+        if not cap.read()[0]:
+            break
+        if time.perf_counter() - t0 > period / 4:
+            break
+        buffered += 1
+    return buffered, buffered * period
+
+
+class FrameGrabber:
+    def __init__(self, src=0, width=640, height=480, profile=None, realtime=True):
+        self.src = src                # camera index, source URI or VideoSource
+        self.realtime = realtime      # False: files and synthetic scenes are read unpaced
+        self.profile = profile or CaptureProfile(width, height)
+        self.width = self.profile.width
+        self.height = self.profile.height
+        self.fps = None
+        self.negotiated = {}          # prop -> (requested, actual)
+        self.cap = None
+
+        self._cond = threading.Condition()
+        self._latest = None          # newest Frame not yet consumed
+        self._thread = None
+        self.running = False
+
+        # counters
+        self.captured = 0
+        self.dropped = 0
+        self.consumed = 0
+        self.read_failures = 0
+        self.ages = deque(maxlen=300)  # s, driver timestamp -> read returned
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self.cap = open_source(self.src, self.realtime, self.profile)
+        self.negotiated = self.cap.negotiated
+        # consumers size their buffers from what the source actually delivers
+        self.width = self.cap.width or self.width
+        self.height = self.cap.height or self.height
+        self.fps = self.cap.fps
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self.running:
+            ret, image = self.cap.read()
+            if not ret:
+                if self.cap.finished:
+                    break      # end of a file or scene
+                self.read_failures += 1
+                time.sleep(0.01)   # don't spin on an unplugged camera
+                continue
+            t = time.perf_counter()
+            age = self.cap.frame_age()
+            with self._cond:
+                if age is not None:
+                    self.ages.append(age)
+                self.captured += 1
+                if self._latest is not None:
+                    self.dropped += 1   # consumer was too slow, overwrite
+                self._latest = Frame(self.captured, t, image)
+                self._cond.notify_all()
+        # the capture is released by the thread reading it, never under a read() in progress
+        self.cap.release()
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+
+    def get(self, timeout=0.0):
+        """Take the newest frame, or None if nothing new arrived in `timeout` s.
+
+        Each frame is returned at most once; timeout=0 never blocks.
+        """
+        with self._cond:
+            if self._latest is None and timeout:
+                self._cond.wait_for(lambda: self._latest is not None or not self.running,
+                                    timeout)
+            frame, self._latest = self._latest, None
+            if frame is not None:
+                self.consumed += 1
+            return frame
+
+    def capture_latency(self):
+        """Median driver timestamp -> read delay in s, None without timestamps."""
+        with self._cond:
+            return statistics.median(self.ages) if self.ages else None
+
+    def stats(self):
+        latency = self.capture_latency()
+        with self._cond:
+            return {
+                "captured": self.captured,
+                "dropped": self.dropped,
+                "consumed": self.consumed,
+                "read_failures": self.read_failures,
+                "capture_latency_ms": round(latency * 1000, 1) if latency is not None else None,
+            }
+
+    def stop(self):
+        self.running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            # a stalled read() can block for seconds; the thread releases the capture when it returns
+            self._thread.join(timeout=1)
+        elif self.cap is not None:
+            self.cap.release()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--src", default="0", help="camera index or device path")
+    ap.add_argument("--size", default="640x480")
+    ap.add_argument("--fps", type=float, default=60)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    args = ap.parse_args()
+    src = int(args.src) if args.src.isdigit() else args.src
+    w, h = (int(v) for v in args.size.split("x"))
+    low = PROFILES["low_latency"]
+    for name, profile in (("default", CaptureProfile(w, h)),
+                          ("low_latency", CaptureProfile(w, h, args.fps, low.fourcc, low.buffer_size))):
+        cap = cv2.VideoCapture(src)
+        if not cap.isOpened():
+            raise SystemExit(f"cannot open {args.src}")
+        negotiated = profile.apply(cap)
+        print(f"{name}: " + ", ".join(f"{k}={v[1]}" for k, v in negotiated.items()))
+        for line in mismatches(negotiated):
+            print(f"  not granted: {line}")
+        ages, t0, n = [], time.perf_counter(), 0
+        while time.perf_counter() - t0 < args.seconds:
+            if cap.read()[0]:
+                n += 1
+                age = frame_age(cap)
+                if age is not None:
+                    ages.append(age)
+        fps = n / (time.perf_counter() - t0)
+        buffered, stale = probe_buffering(cap, 1 / max(fps, 1))
+        ts = f"p50 {statistics.median(ages) * 1000:.1f} ms" if ages else "no driver timestamps"
+        print(f"  {fps:.1f} fps read, timestamp latency {ts}, "
+              f"{buffered} frames buffered after a pause ({stale * 1000:.0f} ms stale)")
+        cap.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+color_lut.py
+HSV color classification for named color profiles.
+
+A profile is a list of HSV ranges; ColorLUT.mask() converts the frame to
+HSV once and ORs one cv2.inRange per range into a binary mask. A hue range
+whose lower hue is above its upper hue wraps around 180, e.g.
+((170, 100, 50), (10, 255, 255)) covers red on both sides of 0; it is
+split into two inRange calls.
+
+The classes used to gather every pixel through a precomputed 2^24 entry
+BGR table. Measured against this chain (run this file) the table was
+slower: random reads into 16 MiB miss the cache on every pixel, numpy
+casts the gather indices to a temporary intp array, and each table took
+0.5 s and ~160 MB of transient memory to build, in every process. A
+quantized table small enough for the cache (5-6 bits per channel, read
+with cv2.remap) kept the cache but lost accuracy at the range borders and
+was slower still. The names ColorLUT / LabelLUT and their API are kept.
+
+Named color profiles live in color_profiles.json. LabelLUT classifies a
+frame against several profiles at once: one HSV conversion, and a label
+image holding one bit per profile (profiles may overlap, which a single
+class index could not express).
+
+    python color_lut.py           # this chain vs the original per-frame code
+"""
+
+import json
+import os
+
+import cv2
+import numpy as np
+
+
+def _normalize(ranges):
+    return tuple((tuple(int(v) for v in lo), tuple(int(v) for v in hi)) for lo, hi in ranges)
+
+
+def _bounds(ranges):
+    """inRange (lower, upper) pairs for normalized ranges, wrapping hues split in two."""
+    bounds = []
+    for (h_lo, s_lo, v_lo), (h_hi, s_hi, v_hi) in ranges:
+        if h_lo <= h_hi:
+            bounds.append(((h_lo, s_lo, v_lo), (h_hi, s_hi, v_hi)))
+        else:  # wraps through 0
+            bounds.append(((h_lo, s_lo, v_lo), (180, s_hi, v_hi)))
+            bounds.append(((0, s_lo, v_lo), (h_hi, s_hi, v_hi)))
+    return tuple(bounds)
+
+
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "color_profiles.json")
+
+
+def load_profiles(path=PROFILES_PATH):
+    """{name: ranges} from a JSON profile file; keys starting with '_' are ignored."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {name: _normalize(ranges) for name, ranges in data.items() if not name.startswith("_")}
+
+
+def _split(frame, scratch):
+    """HSV (h, w, 3) and one (h, w) temporary, both carved out of a (h, w, 4) scratch buffer."""
+    h, w = frame.shape[:2]
+    if scratch is None:
+        scratch = np.empty((h, w, 4), np.uint8)
+    flat = scratch.reshape(-1)
+    return flat[:h * w * 3].reshape(h, w, 3), flat[h * w * 3:h * w * 4].reshape(h, w)
+
+
+class ColorLUT:
+    def __init__(self, ranges):
+        self.ranges = None
+        self.set_ranges(ranges)
+
+    def set_ranges(self, ranges):
+        """Change thresholds; takes effect with the next mask()."""
+        self.ranges = _normalize(ranges)
+        self.bounds = _bounds(self.ranges)
+
+    def mask(self, frame, out=None, scratch=None):
+        """Binary mask (0/255) of `frame` (BGR uint8); a label image for LabelLUT.
+
+        `out` (h, w) uint8 and `scratch` (h, w, 4) uint8 may be passed to
+        avoid all allocations. Without them the call is stateless and
+        thread-safe.
+        """
+        hsv, tmp = _split(frame, scratch)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=hsv)
+        if out is None:
+            out = np.empty(frame.shape[:2], np.uint8)
+        (lo, hi), *rest = self.bounds
+        cv2.inRange(hsv, lo, hi, dst=out)
+        for lo, hi in rest:
+            cv2.inRange(hsv, lo, hi, dst=tmp)
+            cv2.bitwise_or(out, tmp, dst=out)
+        return out
+
+
+class LabelLUT(ColorLUT):
+    """Several named profiles (at most 8) classified in one pass.
+
+    mask() returns a label image with bit k set where the pixel matches
+    self.names[k]; select() extracts a single profile from it.
+    """
+
+    def __init__(self, profiles):
+        if len(profiles) > 8:
+            raise ValueError("at most 8 profiles fit in one label image")
+        self.names = list(profiles)
+        super().__init__(profiles.values())
+
+    def set_ranges(self, ranges):
+        self.ranges = tuple(_normalize(r) for r in ranges)
+        self.bounds = tuple(_bounds(r) for r in self.ranges)
+
+    def mask(self, frame, out=None, scratch=None):
+        hsv, tmp = _split(frame, scratch)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=hsv)
+        if out is None:
+            out = np.empty(frame.shape[:2], np.uint8)
+        out[...] = 0
+        for k, bounds in enumerate(self.bounds):
+            for lo, hi in bounds:
+                cv2.inRange(hsv, lo, hi, dst=tmp)
+                cv2.bitwise_or(out, 1 << k, dst=out, mask=tmp)
+        return out
+
+    def bit(self, name):
+        return 1 << self.names.index(name)
+
+    def select(self, labels, name, out=None):
+        """Non-zero where `labels` matches profile `name`."""
+        return cv2.bitwise_and(labels, self.bit(name), dst=out)
+
+
+def main():
+    import argparse
+    import time
+
+    from bench_pyramid import synthetic_frames
+    from scenes import Scene
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--profile", default="red")
+    args = ap.parse_args()
+
+    ranges = load_profiles()[args.profile]
+    arrays = [(np.array(lo), np.array(hi)) for lo, hi in ranges]
+
+    def baseline(frame):
+        # the original per-frame code: cvtColor, one inRange per range, bitwise_or
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv, *arrays[0])
+        for lo, hi in arrays[1:]:
+            mask = cv2.bitwise_or(mask, cv2.inRange(hsv, lo, hi))
+        return mask
+
+    def timed(fn, frames):
+        best = float("inf")
+        for _ in range(5):
+            t0 = time.perf_counter()
+            for i in range(args.frames):
+                fn(frames[i % len(frames)])
+            best = min(best, (time.perf_counter() - t0) / args.frames)
+        return best * 1000
+
+    print(f"profile {args.profile}, ms per frame (best of 5)")
+    print(f"{'frames':>16s} {'baseline':>9s} {'ColorLUT':>9s} {'+buffers':>9s}  identical")
+    for w, h in ((640, 480), (1280, 720)):
+        lut = ColorLUT(ranges)
+        out, scratch = np.empty((h, w), np.uint8), np.empty((h, w, 4), np.uint8)
+        for name, frames in (("clean", synthetic_frames(30, w, h)),
+                             ("noisy", list(Scene(w, h, noise=14).render(0, 30)[0]))):
+            same = all(np.array_equal(baseline(f), lut.mask(f)) for f in frames)
+            print(f"{w:>5d}x{h:<4d} {name:>6s} {timed(baseline, frames):9.2f} {timed(lut.mask, frames):9.2f} "
+                  f"{timed(lambda f: lut.mask(f, out, scratch), frames):9.2f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+detection.py
+Red object detection, independent of the GUI.
+
+detect_red() runs the blur -> HSV -> inRange -> morphology -> contour chain on
+one BGR frame and returns a compact Detection that can be passed between
+threads (or processes) instead of the frame itself.
+"""
+
+import time
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from color_lut import ColorLUT, load_profiles
+
+# Named HSV color profiles (color_profiles.json)
+PROFILES = load_profiles()
+MIN_AREA = 300                        # px², smaller blobs are treated as noise
+KERNEL = np.ones((5, 5), np.uint8)
+# The red profile's ranges, classified in one HSV pass
+RED_LUT = ColorLUT(PROFILES["red"])
+
+
+@dataclass
+class Detection:
+    frame_id: int
+    t_capture: float                  # time.perf_counter() when the frame was read
+    t_done: float = 0.0               # time.perf_counter() when detection finished
+    cx: int = None
+    cy: int = None
+    bbox: tuple = None                # (x, y, w, h)
+    area: float = 0.0
+    contour: np.ndarray = None        # outline of the target, for overlays only
+    roi: tuple = None                 # (x0, y0, x1, y1) searched, None = full frame
+    track_id: int = None              # persistent id in multi-target mode
+
+    @property
+    def found(self):
+        return self.cx is not None
+
+    @property
+    def latency(self):
+        return self.t_done - self.t_capture
+
+
+def red_mask(frame):
+    frame_blur = cv2.GaussianBlur(frame, (7, 7), 0)
+    mask = RED_LUT.mask(frame_blur)
+
+    # Morphological operations for noise reduction
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, KERNEL)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, KERNEL)
+    return mask
+
+
+def largest_blob(mask, det, min_area=MIN_AREA):
+    """Fill `det` with the largest contour in `mask` above `min_area`."""
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    target_contour = None; max_area = 0
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if area > min_area and area > max_area:
+            max_area = area
+            target_contour = contour
+    if target_contour is None:
+        return det
+
+    M = cv2.moments(target_contour)
+    if M["m00"] != 0:
+        det.cx = int(M["m10"] / M["m00"])
+        det.cy = int(M["m01"] / M["m00"])
+        det.bbox = cv2.boundingRect(target_contour)
+        det.area = max_area
+        det.contour = target_contour
+    return det
+
+
+def offset_detection(det, x0, y0):
+    """Move a detection made on a crop back into full-frame coordinates."""
+    if det.found:
+        det.cx += x0; det.cy += y0
+        bx, by, bw, bh = det.bbox
+        det.bbox = (bx + x0, by + y0, bw, bh)
+        if det.contour is not None:
+            det.contour = det.contour + (x0, y0)
+    return det
+
+
+def scale_detection(det, f):
+    """Map a detection made on a frame shrunk by `f` back to full size."""
+    if det.found:
+        det.cx *= f; det.cy *= f
+        det.bbox = tuple(v * f for v in det.bbox)
+        det.area *= f * f
+        if det.contour is not None:
+            det.contour = det.contour * f
+    if det.roi is not None:
+        det.roi = tuple(v * f for v in det.roi)
+    return det
+
+
+def pyramid_blob(frame, det, mask_fn=red_mask, min_area=MIN_AREA, scale=2, pad=8,
+                 shrink_fn=None, blob_fn=largest_blob):
+    """Coarse-to-fine version of mask_fn + largest_blob.
+
+    Candidate blobs are found on a frame shrunk by `scale` in each direction,
+    then the largest candidates are re-detected in a full-resolution crop
+    around them so the centroid and bbox keep full-resolution accuracy.
+    `shrink_fn(frame, scale)` can replace the default cv2.resize and
+    `blob_fn` the contour backend used for the refinement (see blobs.py).
+    """
+    h, w = frame.shape[:2]
+    if shrink_fn is not None:
+        small = shrink_fn(frame, scale)
+    else:
+        small = cv2.resize(frame, (w // scale, h // scale), interpolation=cv2.INTER_AREA)
+    contours, _ = cv2.findContours(mask_fn(small), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    # allow for area lost to downscaling; the full-res pass applies min_area exactly
+    coarse_min = min_area / (2 * scale * scale)
+    candidates = [c for c in contours if cv2.contourArea(c) > coarse_min]
+    candidates.sort(key=cv2.contourArea, reverse=True)
+
+    for contour in candidates[:3]:
+        x, y, bw, bh = cv2.boundingRect(contour)
+        x0, y0 = max(0, x * scale - pad), max(0, y * scale - pad)
+        x1, y1 = min(w, (x + bw) * scale + pad), min(h, (y + bh) * scale + pad)
+        blob_fn(mask_fn(frame[y0:y1, x0:x1]), det, min_area)
+        if det.found:
+            return offset_detection(det, x0, y0)
+    return det
+
+
+def detect_red(frame, frame_id=0, t_capture=None):
+    if t_capture is None:
+        t_capture = time.perf_counter()
+    det = Detection(frame_id, t_capture)
+    largest_blob(red_mask(frame), det)
+    det.t_done = time.perf_counter()
+    return det
+
+
+def detect_red_pyramid(frame, frame_id=0, t_capture=None, scale=2):
+    if t_capture is None:
+        t_capture = time.perf_counter()
+    det = Detection(frame_id, t_capture)
+    pyramid_blob(frame, det, scale=scale)
+    det.t_done = time.perf_counter()
+    return det
@@ -0,0 +1,39 @@
+"""
+display.py
+Decide which processed frames are rendered for the operator.
+
+Detection and control run on every frame; building the overlay and handing
+frame and overlay to the VideoWidget (which paints the BGR frame as is)
+only happen for frames that will be shown. A frame is shown when a display is attached and visible (not hidden
+or minimized) and at least 1/fps has passed since the last shown frame.
+The gate starts hidden, so a worker without a window never pays for drawing.
+"""
+
+
+class DisplayGate:
+    def __init__(self, fps=15):
+        self.period = 1 / fps if fps else 0.0   # s between shown frames (0 = every frame)
+        self.visible = False          # set by the window on show / hide / minimize
+        self._next = 0.0
+
+        # counters
+        self.shown = 0
+        self.skipped = 0
+
+    def due(self, t):
+        """True if the frame finished at `t` (perf_counter) should be rendered."""
+        if not self.visible or t < self._next:
+            self.skipped += 1
+            return False
+        # keep a steady cadence, but don't burst to catch up after a pause
+        self._next = self._next + self.period if t - self._next < self.period else t + self.period
+        self.shown += 1
+        return True
+
+    def stats(self):
+        total = self.shown + self.skipped
+        return {
+            "shown": self.shown,
+            "skipped": self.skipped,
+            "shown_ratio": self.shown / total if total else 0.0,
+        }
@@ -0,0 +1,93 @@
+"""
+governor.py
+Deadline-driven frame governor.
+
+The tracker worker reports how long each stage took and the end-to-end
+latency (capture -> result) of every frame. When the smoothed latency goes
+over the budget the governor sheds work one level at a time, in this order:
+
+    0  full          everything runs
+    1  no_overlay    skip overlay drawing
+    2  low_res       also detect on a half-size frame
+    3  skip_frames   also process only every other frame
+
+It steps back down once the latency has stayed well under budget for a
+while. Every level change is returned as a message so the caller can log it.
+"""
+
+LEVELS = ("full", "no_overlay", "low_res", "skip_frames")
+
+
+class FrameGovernor:
+    def __init__(self, budget=0.030, alpha=0.1, relax=0.6, hold=30, warmup=10):
+        self.budget = budget        # s, target capture -> result latency
+        self.alpha = alpha          # EMA smoothing factor
+        self.relax = relax          # step down below relax * budget ...
+        self.hold = hold            # ... after this many frames at a level
+        self.warmup = warmup        # first frames (warm-up, caches) are not judged
+        self.level = 0
+        self.latency = 0.0          # EMA of end-to-end latency
+        self.stages = {}            # stage name -> EMA of its duration
+        self.frames_at_level = 0
+        self.frames = 0
+        self.skipped = 0
+
+    @property
+    def draw_overlay(self):
+        return self.level < 1
+
+    @property
+    def scale(self):
+        """Detection downscale factor for the current level."""
+        return 2 if self.level >= 2 else 1
+
+    def skip(self, frame_id):
+        """True if this frame should be dropped without processing."""
+        if self.level >= 3 and frame_id % 2:
+            self.skipped += 1
+            return True
+        return False
+
+    def record(self, stage, seconds):
+        prev = self.stages.get(stage)
+        if prev is None or self.frames < self.warmup:
+            self.stages[stage] = seconds
+        else:
+            self.stages[stage] = prev + self.alpha * (seconds - prev)
+
+    def end_frame(self, latency):
+        """Account one processed frame; returns a message if the level changed."""
+        self.frames += 1
+        self.frames_at_level += 1
+        if self.frames <= self.warmup:
+            self.latency = latency
+            return None
+        self.latency += self.alpha * (latency - self.latency)
+
+        new_level = self.level
+        if self.latency > self.budget and self.level < len(LEVELS) - 1 \
+                and self.frames_at_level >= self.hold // 3:
+            new_level += 1
+        elif self.latency < self.relax * self.budget and self.level > 0 \
+                and self.frames_at_level >= self.hold:
+            new_level -= 1
+        if new_level == self.level:
+            return None
+
+        old = LEVELS[self.level]
+        self.level = new_level
+        self.frames_at_level = 0
+        stages = ", ".join(f"{k}={v * 1000:.1f}" for k, v in self.stages.items())
+        msg = (f"{old} -> {LEVELS[new_level]}: latency {self.latency * 1000:.1f} ms "
+               f"(budget {self.budget * 1000:.0f} ms; stages ms: {stages})")
+        self.latency = latency      # judge the new level on its own frames
+        return msg
+
+    def stats(self):
+        return {
+            "level": LEVELS[self.level],
+            "latency_ms": round(self.latency * 1000, 2),
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "stages_ms": {k: round(v * 1000, 2) for k, v in self.stages.items()},
+        }
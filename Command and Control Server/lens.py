@@ -0,0 +1,166 @@
+"""
+lens.py
+Lens-distortion correction for detected points instead of whole frames.
+
+Steering only needs the target position, so rather than remapping every
+frame (initUndistortRectifyMap + remap, ~2 ms at 640x480) the detector keeps
+working on the raw image and only the centroid and bbox corners go through
+cv2.undistortPoints (P = K, so results stay in pixels): a few microseconds.
+For five points the iterative C solver is cheaper than interpolating a
+precomputed grid in NumPy, so no grid is kept.
+
+Intrinsics come from a checkerboard calibration or a JSON file:
+
+    python lens.py calibrate shots/*.png --pattern 9x6 --out camera.json
+    python lens.py bench [camera.json]
+"""
+
+import argparse
+import glob
+import json
+import time
+from dataclasses import replace
+
+import cv2
+import numpy as np
+
+
+def calibrate(images, pattern=(9, 6), square=1.0):
+    """(K, dist, size, rms) from BGR or gray checkerboard shots.
+
+    `pattern` is the number of inner corners (columns, rows); `square` only
+    scales the (unused) extrinsics.
+    """
+    grid = np.zeros((pattern[0] * pattern[1], 3), np.float32)
+    grid[:, :2] = np.mgrid[0:pattern[0], 0:pattern[1]].T.reshape(-1, 2) * square
+    criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+    obj_points, img_points, size = [], [], None
+    for image in images:
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        size = gray.shape[::-1]
+        ok, corners = cv2.findChessboardCorners(gray, pattern)
+        if not ok:
+            continue
+        obj_points.append(grid)
+        img_points.append(cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria))
+    if len(obj_points) < 3:
+        raise ValueError(f"checkerboard found in {len(obj_points)} images, need at least 3")
+    rms, K, dist, _, _ = cv2.calibrateCamera(obj_points, img_points, size, None, None)
+    return K, dist.ravel(), size, rms
+
+
+def save_intrinsics(path, K, dist, size, rms=None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"width": size[0], "height": size[1], "K": np.asarray(K).tolist(),
+                   "dist": np.asarray(dist).ravel().tolist(), "rms": rms}, f, indent=2)
+
+
+def load_intrinsics(path):
+    """(K, dist, size) saved by save_intrinsics."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return np.array(data["K"], float), np.array(data["dist"], float), (data["width"], data["height"])
+
+
+class LensModel:
+    def __init__(self, K, dist, size):
+        self.K = np.ascontiguousarray(K, np.float64)
+        self.dist = np.ascontiguousarray(np.ravel(dist), np.float64)
+        self.size = tuple(size)         # (w, h) the intrinsics belong to
+        self._pts = np.empty((5, 1, 2), np.float64)   # centroid + 4 bbox corners
+        self._K_inv = np.linalg.inv(self.K)
+
+    @classmethod
+    def load(cls, path, size=None):
+        K, dist, calib_size = load_intrinsics(path)
+        model = cls(K, dist, calib_size)
+        return model if size is None or tuple(size) == calib_size else model.scaled(size)
+
+    def scaled(self, size):
+        """The same lens at another capture resolution (same aspect ratio)."""
+        K = self.K.copy()
+        K[0] *= size[0] / self.size[0]
+        K[1] *= size[1] / self.size[1]
+        return LensModel(K, self.dist, size)
+
+    def undistort(self, points):
+        """(N, 2) raw pixel coordinates -> (N, 2) ideal pinhole coordinates."""
+        pts = np.asarray(points, np.float64).reshape(-1, 1, 2)
+        return cv2.undistortPoints(pts, self.K, self.dist, P=self.K).reshape(-1, 2)
+
+    def distort(self, points):
+        """Inverse of undistort: ideal pixel coordinates back onto the raw image."""
+        pts = np.asarray(points, float).reshape(-1, 1, 2)
+        norm = cv2.convertPointsToHomogeneous(pts).reshape(-1, 3) @ self._K_inv.T
+        raw, _ = cv2.projectPoints(norm, np.zeros(3), np.zeros(3), self.K, self.dist)
+        return raw.reshape(-1, 2)
+
+    def correct(self, det):
+        """Copy of `det` with centroid and bbox in ideal pinhole coordinates."""
+        if not det.found:
+            return det
+        x, y, w, h = det.bbox
+        pts = self._pts
+        pts[:, 0, 0] = det.cx, x, x + w, x, x + w
+        pts[:, 0, 1] = det.cy, y, y, y + h, y + h
+        p = cv2.undistortPoints(pts, self.K, self.dist, P=self.K)[:, 0]
+        (x0, y0), (x1, y1) = p[1:].min(axis=0), p[1:].max(axis=0)
+        return replace(det, cx=round(float(p[0, 0])), cy=round(float(p[0, 1])),
+                       bbox=(int(x0), int(y0), round(float(x1 - x0)), round(float(y1 - y0))),
+                       contour=None)
+
+
+def bench(model, repeats=2000):
+    from detection import Detection
+    w, h = model.size
+    frame = np.random.default_rng(0).integers(0, 256, (h, w, 3), np.uint8)
+    map1, map2 = cv2.initUndistortRectifyMap(model.K, model.dist, None, model.K,
+                                             model.size, cv2.CV_16SC2)
+    det = Detection(0, 0.0, cx=w - 40, cy=h - 30, bbox=(w - 80, h - 60, 70, 50), area=3500.0)
+
+    t0 = time.perf_counter()
+    for _ in range(repeats // 20):
+        cv2.remap(frame, map1, map2, cv2.INTER_LINEAR)
+    remap_us = (time.perf_counter() - t0) * 1e6 / (repeats // 20)
+    pts = np.array([[det.cx, det.cy]], np.float32).reshape(-1, 1, 2)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        cv2.undistortPoints(pts, model.K, model.dist, P=model.K)
+    direct_us = (time.perf_counter() - t0) * 1e6 / repeats
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        model.correct(det)
+    correct_us = (time.perf_counter() - t0) * 1e6 / repeats
+
+    ideal = model.correct(det)
+    print(f"{w}x{h}: remap full frame {remap_us:.0f} us, undistortPoints (1 pt) {direct_us:.1f} us, "
+          f"LensModel.correct (centroid + 4 corners) {correct_us:.1f} us; "
+          f"centroid near the corner moves {np.hypot(ideal.cx - det.cx, ideal.cy - det.cy):.1f} px")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("calibrate")
+    c.add_argument("images", nargs="+", help="checkerboard shots (globs allowed)")
+    c.add_argument("--pattern", default="9x6", help="inner corners, COLSxROWS")
+    c.add_argument("--out", default="camera.json")
+    b = sub.add_parser("bench")
+    b.add_argument("intrinsics", nargs="?", help="JSON from 'calibrate' (default: a typical webcam)")
+    args = ap.parse_args()
+
+    if args.cmd == "calibrate":
+        paths = [p for pattern in args.images for p in sorted(glob.glob(pattern))]
+        pattern = tuple(int(v) for v in args.pattern.split("x"))
+        K, dist, size, rms = calibrate((cv2.imread(p) for p in paths), pattern)
+        save_intrinsics(args.out, K, dist, size, rms)
+        print(f"{len(paths)} images, {size[0]}x{size[1]}, RMS reprojection error {rms:.3f} px -> {args.out}")
+    elif args.intrinsics:
+        bench(LensModel.load(args.intrinsics))
+    else:
+        K = [[600.0, 0, 320], [0, 600.0, 240], [0, 0, 1]]
+        bench(LensModel(K, [-0.30, 0.10, 0, 0, 0], (640, 480)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+lockon.py
+Lock-on mode: full detection every N frames, cheap tracking in between.
+
+Once the detector has found the target, the frames in between full
+detections only classify a small search region by color
+(no blur, no morphology, no contours) and let CamShift follow the target
+on that back-projection. The full detector runs again every `detect_every`
+frames, or immediately when the tracked window's fill drops below
+`min_confidence` of what it was at the last detection.
+"""
+
+import time
+
+import cv2
+
+from detection import Detection, RED_LUT
+
+CAMSHIFT_CRITERIA = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 5, 1)
+
+
+class LockOnTracker:
+    def __init__(self, detector, lut=RED_LUT, detect_every=10, min_confidence=0.5):
+        self.detector = detector      # anything with RoiTracker's update/observe/reset
+        self.lut = lut
+        self.detect_every = detect_every
+        self.min_confidence = min_confidence
+
+        self.window = None            # (x, y, w, h) being tracked, None = not locked
+        self.ref_fill = 0.0           # mask fill of the bbox at the last detection
+        self.since_detect = 0
+
+        # metrics
+        self.detect_frames = 0
+        self.track_frames = 0
+        self.track_attempts = 0       # includes attempts that lost confidence
+        self.detect_time = 0.0
+        self.track_time = 0.0
+
+    def reset(self):
+        self.window = None
+        self.detector.reset()
+
+    def update(self, frame, frame_id=0, t_capture=None):
+        if t_capture is None:
+            t_capture = time.perf_counter()
+        if self.window is not None and self.since_detect < self.detect_every:
+            t0 = time.perf_counter()
+            det = self.track(frame, Detection(frame_id, t_capture))
+            self.track_time += time.perf_counter() - t0
+            self.track_attempts += 1
+            if det.found:
+                self.track_frames += 1
+                self.since_detect += 1
+                self.detector.observe(det)
+                det.t_done = time.perf_counter()
+                return det
+        # not locked, due for a refresh, or confidence dropped: full detection
+        t0 = time.perf_counter()
+        det = self.detector.update(frame, frame_id, t_capture)
+        self.detect_time += time.perf_counter() - t0
+        self.detect_frames += 1
+        self.lock(frame, det)
+        return det
+
+    def lock(self, frame, det):
+        self.since_detect = 0
+        if not det.found:
+            self.window = None
+            return
+        x, y, w, h = det.bbox
+        mask = self.lut.mask(frame[y:y + h, x:x + w])
+        self.ref_fill = cv2.countNonZero(mask) / float(w * h)
+        self.window = det.bbox
+
+    def track(self, frame, det):
+        """CamShift the window over the color back-projection of a search region."""
+        fh, fw = frame.shape[:2]
+        x, y, w, h = self.window
+        # search region: the window plus half its size on every side
+        x0, y0 = max(0, x - w // 2), max(0, y - h // 2)
+        x1, y1 = min(fw, x + w + w // 2), min(fh, y + h + h // 2)
+        if x1 - x0 < 4 or y1 - y0 < 4:
+            self.window = None
+            return det
+        backproj = self.lut.mask(frame[y0:y1, x0:x1])
+        _, (wx, wy, ww, wh) = cv2.CamShift(backproj, (x - x0, y - y0, w, h), CAMSHIFT_CRITERIA)
+        if ww <= 0 or wh <= 0:
+            self.window = None
+            return det
+
+        target = backproj[wy:wy + wh, wx:wx + ww]
+        fill = cv2.countNonZero(target) / float(ww * wh)
+        if self.ref_fill <= 0 or fill / self.ref_fill < self.min_confidence:
+            self.window = None        # lost confidence, the detector takes over
+            return det
+
+        M = cv2.moments(target, binaryImage=True)
+        det.cx = int(M["m10"] / M["m00"]) + wx + x0
+        det.cy = int(M["m01"] / M["m00"]) + wy + y0
+        det.bbox = (wx + x0, wy + y0, ww, wh)
+        det.area = M["m00"]
+        det.roi = (x0, y0, x1, y1)
+        self.window = det.bbox
+        return det
+
+    def stats(self):
+        frames = self.detect_frames + self.track_frames
+        return {
+            "detect_frames": self.detect_frames,
+            "track_frames": self.track_frames,
+            "track_ratio": self.track_frames / frames if frames else 0.0,
+            "detect_ms": self.detect_time * 1000 / self.detect_frames if self.detect_frames else 0.0,
+            "track_ms": self.track_time * 1000 / self.track_attempts if self.track_attempts else 0.0,
+            "track_lost": self.track_attempts - self.track_frames,
+            **self.detector.stats(),
+        }
@@ -1,8 +1,19 @@
+import argparse
 import cv2
 import numpy as np
 
-# Open webcam (use 0 for default camera)
-cap = cv2.VideoCapture(0)
+from color_lut import ColorLUT, load_profiles
+from sources import add_source_argument, open_source
+
+# Red color range in HSV ("red_strict" in color_profiles.json), both hue
+# ranges classified in one pass
+red_lut = ColorLUT(load_profiles()["red_strict"])
+
+# Open the video source (webcam 0 by default; a file, directory or synth: URI also works)
+ap = argparse.ArgumentParser(description="Red object tracking with direction")
+add_source_argument(ap)
+args = ap.parse_args()
+cap = open_source(args.source, realtime=not args.fast)
 
 while True:
     ret, frame = cap.read()
@@ -13,19 +24,8 @@ while True:
     h, w, _ = frame.shape
     center_x, center_y = w // 2, h // 2
 
-    # Convert BGR to HSV
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-
-    # Define red color range in HSV
-    lower_red1 = np.array([0, 170, 120])
-    upper_red1 = np.array([10, 255, 255])
-    lower_red2 = np.array([170, 170, 120])
-    upper_red2 = np.array([180, 255, 255])
-
-    # Combine both masks
-    mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-    mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
-    mask = mask1 + mask2
+    # Red mask (both hue ranges, one HSV conversion)
+    mask = red_lut.mask(frame)
 
     # Noise removal
     mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((5,5), np.uint8))
@@ -0,0 +1,150 @@
+"""
+motion_detector.py
+Background-subtraction detector for sentry use: finds whatever moves,
+whatever its color.
+
+The frame is shrunk by `scale`, compared with a background model and the
+largest foreground blob is reported as a Detection in full-frame
+coordinates, so it drops in wherever a RoiTracker is used and the MOVE_DIR
+logic does not change. Models:
+
+    mog2     cv2 BackgroundSubtractorMOG2 (shadow detection off)
+    knn      cv2 BackgroundSubtractorKNN (shadow detection off)
+    average  running average of the grayscale frame (accumulateWeighted),
+             foreground where it differs by more than `threshold` levels
+
+`learning_rate` is the fraction of the background replaced per frame. For
+the first `warmup` frames the model learns faster (1 / frames seen) and no
+detections are reported. Run this file to print timings:
+
+    python motion_detector.py
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from detection import Detection, MIN_AREA, largest_blob, scale_detection
+
+METHODS = ("mog2", "knn", "average")
+KERNEL = np.ones((3, 3), np.uint8)   # at reduced resolution a 5x5 kernel eats small targets
+
+
+class MotionDetector:
+    def __init__(self, method="mog2", scale=2, learning_rate=0.01, warmup=30,
+                 threshold=25, min_area=MIN_AREA, blob_fn=largest_blob):
+        if method not in METHODS:
+            raise ValueError(f"unknown method: {method}")
+        self.method = method
+        self.scale = scale                  # detect on a frame shrunk by this factor
+        self.learning_rate = learning_rate
+        self.warmup = warmup                # frames before detections are reported
+        self.threshold = threshold          # levels, "average" model only
+        self.min_area = min_area            # px² at full resolution
+        self.blob_fn = blob_fn              # blob backend, see blobs.py
+        self.model = None
+        self.seen = 0                       # frames the current model has learned
+
+        # counters
+        self.frames = 0
+        self.motion_frames = 0
+        self.time = 0.0
+
+    def reset(self):
+        """Drop the background model; it is relearned over the next `warmup` frames."""
+        self.model = None
+        self.seen = 0
+
+    def observe(self, det):
+        pass                                # no state carried between detections
+
+    def _new_model(self, shape):
+        if self.method == "mog2":
+            return cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+        if self.method == "knn":
+            return cv2.createBackgroundSubtractorKNN(detectShadows=False)
+        return np.zeros(shape[:2], np.float32)
+
+    def foreground(self, small):
+        """Binary foreground mask of an already shrunk frame; updates the model."""
+        if self.model is None:
+            self.model = self._new_model(small.shape)
+        self.seen += 1
+        rate = max(self.learning_rate, 1.0 / self.seen)
+        if self.method == "average":
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+            gray = cv2.GaussianBlur(gray, (5, 5), 0)
+            cv2.accumulateWeighted(gray, self.model, rate)
+            diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.model))
+            _, mask = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        else:
+            mask = self.model.apply(small, learningRate=rate)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, KERNEL)
+        return cv2.morphologyEx(mask, cv2.MORPH_DILATE, KERNEL, iterations=2)
+
+    def update(self, frame, frame_id=0, t_capture=None):
+        if t_capture is None:
+            t_capture = time.perf_counter()
+        t0 = time.perf_counter()
+        det = Detection(frame_id, t_capture)
+        h, w = frame.shape[:2]
+        s = self.scale
+        small = frame if s == 1 else cv2.resize(frame, (w // s, h // s),
+                                                interpolation=cv2.INTER_AREA)
+        mask = self.foreground(small)
+        self.frames += 1
+        if self.seen > self.warmup:
+            self.blob_fn(mask, det, self.min_area / (s * s))
+            scale_detection(det, s)
+            self.motion_frames += det.found
+        det.t_done = time.perf_counter()
+        self.time += det.t_done - t0
+        return det
+
+    def stats(self):
+        return {
+            "method": self.method,
+            "frames": self.frames,
+            "motion_frames": self.motion_frames,
+            "detect_ms": round(self.time * 1000 / self.frames, 3) if self.frames else 0.0,
+        }
+
+
+def moving_target_frames(n, w, h, seed=0):
+    """Noisy static background with one gray disc crossing it."""
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(0, 256, (h, w, 3), np.uint8), (0, 0), 8)
+    r = max(8, h // 16)
+    frames = []
+    for i in range(n):
+        frame = background.copy()
+        x = int(r + (w - 2 * r) * (i % 100) / 99)
+        cv2.circle(frame, (x, h // 2), r, (200, 200, 200), -1)
+        noise = rng.integers(-4, 5, frame.shape, np.int16)
+        frames.append(np.clip(frame + noise, 0, 255).astype(np.uint8))
+    return frames
+
+
+def main():
+    from pipeline import FramePipeline
+    print(f"{'resolution':>10s} {'detector':>14s} {'ms/frame':>9s} {'found':>6s}")
+    for w, h in ((320, 240), (640, 480)):
+        frames = moving_target_frames(200, w, h)
+        color = FramePipeline()
+        color(frames[0])                       # warm up
+        t0 = time.perf_counter()
+        for f in frames:
+            largest_blob(color(f), Detection(0, 0.0))
+        ms = (time.perf_counter() - t0) * 1000 / len(frames)
+        print(f"{w:>5d}x{h:<4d} {'color (ref)':>14s} {ms:9.3f}")
+        for method in METHODS:
+            for scale in (1, 2):
+                det = MotionDetector(method, scale=scale, min_area=MIN_AREA / 4)
+                found = sum(det.update(f).found for f in frames)
+                print(f"{w:>5d}x{h:<4d} {f'{method} 1/{scale}':>14s} "
+                      f"{det.stats()['detect_ms']:9.3f} {found / (len(frames) - det.warmup):6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+motion_gate.py
+Skip full detection when the scene has not changed.
+
+Each frame is shrunk to a tiny thumbnail and compared with the thumbnail of
+the last frame that was actually processed. If no thumbnail pixel changed
+by more than `threshold` levels in any channel, the caller can reuse the
+previous detection. The thumbnail keeps its color: a red target on a gray
+background can be nearly invisible in grayscale. Comparing against the last
+processed frame (not the previous frame) means slow drift still triggers a
+new detection eventually.
+"""
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    def __init__(self, size=(32, 24), threshold=6, max_gated=30):
+        self.size = size              # thumbnail (w, h)
+        self.threshold = threshold    # levels, largest allowed thumbnail change
+        self.max_gated = max_gated    # force a detection after this many gated frames
+        self.ref = None               # thumbnail of the last processed frame
+        self._thumb = np.empty((size[1], size[0], 3), np.uint8)
+        self._diff = np.empty((size[1], size[0], 3), np.uint8)
+        self.in_a_row = 0
+
+        # counters
+        self.frames = 0
+        self.gated = 0
+
+    def changed(self, frame):
+        """True if `frame` needs a full detection, False if the last result still holds."""
+        self.frames += 1
+        # area-average every 4th pixel: still ~25 samples per thumbnail cell to
+        # average out sensor noise, at a fraction of the cost of the full frame
+        cv2.resize(frame[::4, ::4], self.size, dst=self._thumb, interpolation=cv2.INTER_AREA)
+        if self.ref is not None and self.in_a_row < self.max_gated:
+            cv2.absdiff(self._thumb, self.ref, dst=self._diff)
+            if self._diff.max() <= self.threshold:
+                self.gated += 1
+                self.in_a_row += 1
+                return False
+        self.ref = self._thumb.copy()
+        self.in_a_row = 0
+        return True
+
+    def reset(self):
+        self.ref = None
+
+    @property
+    def gated_ratio(self):
+        return self.gated / self.frames if self.frames else 0.0
+
+    def stats(self):
+        return {"frames": self.frames, "gated": self.gated,
+                "gated_ratio": round(self.gated_ratio, 3)}
@@ -0,0 +1,159 @@
+"""
+multi_target.py
+Multi-target tracker with persistent ids and a pluggable engagement policy.
+
+Every blob of every frame is kept. Tracks live in NumPy arrays, and frame to
+frame association is a cost matrix over all (track, blob) pairs:
+
+    cost = distance / max_dist + area_weight * |log(area ratio)|
+
+Pairs further apart than max_dist are impossible. Matching takes mutual best
+pairs (row minimum == column minimum) over a few rounds, so no Python loop
+runs per blob and hundreds of blobs stay cheap.
+
+A policy then picks the track that drives the MOVE_DIR logic:
+
+    largest   biggest blob seen this frame
+    closest   closest to the frame center
+    oldest    longest-lived track
+    pinned    the track chosen by the operator (falls back to largest)
+
+With several target colors every blob carries a class (its color profile
+index); a track only ever matches blobs of its own class.
+"""
+
+import numpy as np
+
+from detection import Detection
+
+
+class MultiTargetTracker:
+    def __init__(self, max_dist=80.0, area_weight=0.5, max_misses=5, rounds=3):
+        self.max_dist = max_dist        # px, largest allowed frame-to-frame jump
+        self.area_weight = area_weight
+        self.max_misses = max_misses    # frames a track survives without a blob
+        self.rounds = rounds            # mutual-best matching rounds
+        self.pinned_id = None
+
+        self.ids = np.empty(0, np.int64)
+        self.pos = np.empty((0, 2))
+        self.vel = np.empty((0, 2))
+        self.bbox = np.empty((0, 4), np.int64)
+        self.area = np.empty(0)
+        self.born = np.empty(0, np.int64)    # frame number of the first sighting
+        self.misses = np.empty(0, np.int64)
+        self.cls = np.empty(0, np.int64)     # color profile index
+        self.next_id = 1
+        self.frame = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def associate(self, centroids, areas, classes):
+        """Indices (tracks, blobs) of matched pairs."""
+        if not len(self.ids) or not len(centroids):
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        predicted = self.pos + self.vel * (self.misses + 1)[:, None]
+        dist = np.linalg.norm(predicted[:, None, :] - centroids[None, :, :], axis=2)
+        cost = dist / self.max_dist + \
+            self.area_weight * np.abs(np.log(self.area[:, None] / areas[None, :]))
+        cost[dist > self.max_dist] = np.inf
+        cost[self.cls[:, None] != classes[None, :]] = np.inf
+
+        rows, cols = [], []
+        for _ in range(self.rounds):
+            best_col = np.argmin(cost, axis=1)
+            best_row = np.argmin(cost, axis=0)
+            r = np.flatnonzero((best_row[best_col] == np.arange(len(cost))) &
+                               np.isfinite(cost[np.arange(len(cost)), best_col]))
+            if not len(r):
+                break
+            c = best_col[r]
+            rows.append(r); cols.append(c)
+            cost[r, :] = np.inf
+            cost[:, c] = np.inf
+        if not rows:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def update(self, centroids, bboxes, areas, classes=None):
+        """Feed all blobs of one frame (full-frame coordinates, see blobs.blob_arrays)."""
+        self.frame += 1
+        if classes is None:
+            classes = np.zeros(len(centroids), np.int64)
+        ti, di = self.associate(centroids, areas, classes)
+
+        # matched tracks
+        steps = (self.misses[ti] + 1)[:, None]
+        self.vel[ti] = (centroids[di] - self.pos[ti]) / steps
+        self.pos[ti] = centroids[di]
+        self.bbox[ti] = bboxes[di]
+        self.area[ti] = areas[di]
+        missed = np.ones(len(self.ids), bool); missed[ti] = False
+        self.misses[ti] = 0
+        self.misses[missed] += 1
+
+        # drop stale tracks
+        keep = self.misses <= self.max_misses
+        self.ids, self.pos, self.vel = self.ids[keep], self.pos[keep], self.vel[keep]
+        self.bbox, self.area = self.bbox[keep], self.area[keep]
+        self.born, self.misses, self.cls = self.born[keep], self.misses[keep], self.cls[keep]
+
+        # new tracks for unmatched blobs
+        new = np.ones(len(centroids), bool); new[di] = False
+        n = int(new.sum())
+        if n:
+            self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + n)])
+            self.next_id += n
+            self.pos = np.concatenate([self.pos, centroids[new]])
+            self.vel = np.concatenate([self.vel, np.zeros((n, 2))])
+            self.bbox = np.concatenate([self.bbox, bboxes[new]])
+            self.area = np.concatenate([self.area, areas[new]])
+            self.born = np.concatenate([self.born, np.full(n, self.frame)])
+            self.misses = np.concatenate([self.misses, np.zeros(n, np.int64)])
+            self.cls = np.concatenate([self.cls, classes[new]])
+
+    # ---------- engagement policies ----------
+    def select(self, policy, center):
+        """Index of the track the policy engages, None if nothing is visible."""
+        visible = np.flatnonzero(self.misses == 0)
+        if not len(visible):
+            return None
+        if policy == "pinned":
+            hit = np.flatnonzero((self.ids == self.pinned_id) & (self.misses == 0))
+            if len(hit):
+                return int(hit[0])
+            policy = "largest"
+        if policy == "largest":
+            return int(visible[np.argmax(self.area[visible])])
+        if policy == "closest":
+            d = np.linalg.norm(self.pos[visible] - np.asarray(center, float), axis=1)
+            return int(visible[np.argmin(d)])
+        if policy == "oldest":
+            return int(visible[np.argmin(self.born[visible])])
+        raise ValueError(f"unknown policy: {policy}")
+
+    def pin_at(self, x, y):
+        """Pin the visible track closest to (x, y); returns its id or None."""
+        visible = np.flatnonzero(self.misses == 0)
+        if not len(visible):
+            self.pinned_id = None
+            return None
+        d = np.linalg.norm(self.pos[visible] - (x, y), axis=1)
+        self.pinned_id = int(self.ids[visible[np.argmin(d)]])
+        return self.pinned_id
+
+    def detection(self, i, frame_id, t_capture):
+        det = Detection(frame_id, t_capture)
+        if i is not None:
+            det.cx, det.cy = int(self.pos[i, 0]), int(self.pos[i, 1])
+            det.bbox = tuple(int(v) for v in self.bbox[i])
+            det.area = float(self.area[i])
+            det.track_id = int(self.ids[i])
+        return det
+
+    def visible_tracks(self):
+        """(id, bbox, class) of every track seen this frame, for overlays."""
+        visible = np.flatnonzero(self.misses == 0)
+        return [(int(self.ids[i]), tuple(int(v) for v in self.bbox[i]), int(self.cls[i]))
+                for i in visible]
@@ -0,0 +1,265 @@
+"""
+multicam.py
+Multi-camera runtime: capture and detection in separate processes, frames
+in shared memory.
+
+    camera 0 --capture proc--> FrameRing 0 --+
+    camera 1 --capture proc--> FrameRing 1 --+--> detector procs --> results --> server
+    ...                                      |    (zero-copy views)
+
+Each capture process reads its camera into the next slot of a
+multiprocessing.shared_memory ring, publishes it as the ring's latest slot
+and wakes its detector. Like capture.FrameGrabber, this is a latest-frame
+mailbox: a detector always takes the newest frame, and frames it never got
+to are counted as dropped. Every camera is served by one detector process
+(camera % workers) because the trackers keep per-camera state. Use at least
+as many workers as cameras to spread the load.
+
+Frames are never pickled, only the small Detection results are. A slot
+carries a sequence number that is cleared while it is being written. A
+detection whose slot changed underneath it is discarded and counted as torn.
+
+Each detector process calls cv2.setNumThreads(cv_threads), by default
+cores // workers, so N workers don't each start a full OpenCV thread pool.
+
+    python multicam.py --sources 0 1 --workers 2
+    python multicam.py --sources a.avi b.avi c.avi --workers 3 --seconds 10 --fast
+    python multicam.py --sources synth:1280x720?loop synth:1280x720?loop
+    python newguibrain.py --cameras 0 1     # server: merged results steer the turret
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from capture import CaptureProfile
+from sources import open_source
+
+
+class FrameRing:
+    """`slots` BGR frames, per-slot frame_id / t_capture and the newest slot, in one shared block.
+
+    Only the creating process unlinks the block. Spawned processes share the
+    creator's resource tracker, so attaching elsewhere needs no bookkeeping.
+    """
+
+    def __init__(self, shape, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        header = 8 + slots * 16                   # newest slot, then int64 seq + float64 t per slot
+        size = header + slots * int(np.prod(shape))
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        buf = self.shm.buf
+        self.newest = np.ndarray(1, np.int64, buf, 0)
+        self.seq = np.ndarray(slots, np.int64, buf, 8)
+        self.t = np.ndarray(slots, np.float64, buf, 8 + slots * 8)
+        self.frames = np.ndarray((slots, *shape), np.uint8, buf, header)
+        if self.owner:
+            self.newest[0] = -1
+            self.seq[:] = -1
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """Picklable description for attaching from another process."""
+        return self.shape, self.slots, self.name
+
+    @classmethod
+    def attach(cls, spec):
+        shape, slots, name = spec
+        return cls(shape, slots, name)
+
+    def close(self):
+        # drop the views first, SharedMemory.close refuses while they exist
+        self.newest = self.seq = self.t = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def capture_main(src, ring_spec, wake, stop, realtime=True):
+    ring = FrameRing.attach(ring_spec)
+    h, w = ring.shape[:2]
+    # realtime=False reads files and synthetic scenes unpaced: the ring keeps only the newest frames
+    cap = open_source(src, realtime=realtime, profile=CaptureProfile(w, h))
+    frame_id, slot = 0, 0
+    while not stop.is_set():
+        ok, frame = cap.read()
+        if not ok:
+            if cap.finished:
+                break                             # end of a file or scene
+            time.sleep(0.01)                      # transient camera failure, like FrameGrabber
+            continue
+        t_capture = time.perf_counter()
+        frame_id += 1
+        ring.seq[slot] = -1                       # being written
+        if frame.shape == ring.shape:
+            ring.frames[slot] = frame
+        else:
+            cv2.resize(frame, (w, h), dst=ring.frames[slot])
+        ring.t[slot] = t_capture
+        ring.seq[slot] = frame_id
+        ring.newest[0] = slot
+        wake.set()
+        slot = (slot + 1) % ring.slots
+    cap.release()
+    ring.close()
+
+
+def make_tracker():
+    from lockon import LockOnTracker
+    from tracking import RoiTracker
+    return LockOnTracker(RoiTracker(pyramid=2))
+
+
+def detector_main(ring_specs, wake, stop, results, cv_threads):
+    cv2.setNumThreads(cv_threads)
+    rings = {cam: FrameRing.attach(spec) for cam, spec in ring_specs.items()}
+    trackers = {cam: make_tracker() for cam in rings}
+    last = dict.fromkeys(rings, 0)                # newest frame_id handled per camera
+    while not stop.is_set():
+        if not wake.wait(0.1):
+            continue
+        wake.clear()
+        for cam, ring in rings.items():
+            slot = int(ring.newest[0])
+            frame_id = int(ring.seq[slot]) if slot >= 0 else -1
+            if frame_id <= last[cam]:
+                continue                          # nothing new, or being written
+            dropped, last[cam] = frame_id - last[cam] - 1, frame_id
+            det = trackers[cam].update(ring.frames[slot], frame_id, float(ring.t[slot]))
+            # the frame must not have changed while it was being read
+            results.put((cam, det if ring.seq[slot] == frame_id else None, dropped))
+    for ring in rings.values():
+        ring.close()
+
+
+class MultiCamRuntime:
+    def __init__(self, sources, size=(640, 480), workers=None, slots=4, cv_threads=None, realtime=True):
+        self.sources = list(sources)
+        self.size = size
+        self.realtime = realtime                  # pace files and synthetic scenes like cameras
+        self.workers = workers or len(self.sources)
+        cores = os.cpu_count() or 1
+        self.cv_threads = cv_threads or max(1, cores // self.workers)
+        self.slots = slots
+        self.ctx = mp.get_context("spawn")        # no forked Qt / camera state
+        self.rings = []
+        self.procs = []
+        self.latest = {}                          # camera -> newest Detection
+        self.done = [0] * len(self.sources)
+        self.torn = [0] * len(self.sources)
+        self.dropped = [0] * len(self.sources)
+
+    def start(self):
+        w, h = self.size
+        self.rings = [FrameRing((h, w, 3), self.slots) for _ in self.sources]
+        self.stop_capture, self.stop_detect = self.ctx.Event(), self.ctx.Event()
+        self.results = self.ctx.Queue()
+        self.wakes = [self.ctx.Event() for _ in range(self.workers)]   # one per detector
+        for k in range(self.workers):
+            specs = {cam: ring.spec() for cam, ring in enumerate(self.rings)
+                     if cam % self.workers == k}
+            self.procs.append(self.ctx.Process(
+                target=detector_main,
+                args=(specs, self.wakes[k], self.stop_detect, self.results, self.cv_threads),
+                daemon=True))
+        for cam, src in enumerate(self.sources):
+            self.procs.append(self.ctx.Process(
+                target=capture_main,
+                args=(src, self.rings[cam].spec(), self.wakes[cam % self.workers], self.stop_capture,
+                      self.realtime),
+                daemon=True))
+        for p in self.procs:
+            p.start()
+
+    def get(self, timeout=0.1):
+        """Next (camera, Detection) from any camera, None on timeout or a torn frame."""
+        try:
+            cam, det, dropped = self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self.dropped[cam] += dropped
+        if det is None:
+            self.torn[cam] += 1
+            return None
+        self.done[cam] += 1
+        self.latest[cam] = det
+        return cam, det
+
+    def frame(self, cam, det):
+        """Copy of the frame `det` was made on, None if its slot was reused since."""
+        ring = self.rings[cam]
+        hits = np.flatnonzero(ring.seq == det.frame_id)
+        return ring.frames[hits[0]].copy() if len(hits) else None
+
+    @property
+    def capturing(self):
+        return any(p.is_alive() for p in self.procs[self.workers:])
+
+    def stop(self):
+        self.stop_capture.set()
+        for p in self.procs[self.workers:]:
+            p.join(timeout=2)
+        self.stop_detect.set()
+        while any(p.is_alive() for p in self.procs[:self.workers]):
+            self.get(timeout=0.05)                # keep the result pipe drained
+        for p in self.procs:
+            p.join(timeout=2)
+        for ring in self.rings:
+            ring.close()
+
+    def stats(self):
+        return [{"camera": cam, "source": src, "detected": self.done[cam],
+                 "dropped": self.dropped[cam], "torn": self.torn[cam]}
+                for cam, src in enumerate(self.sources)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sources", nargs="+", default=["0"], help="camera indices, video files or source URIs (see sources.py)")
+    ap.add_argument("--workers", type=int, default=None, help="detector processes (default: one per camera)")
+    ap.add_argument("--cv-threads", type=int, default=None, help="OpenCV threads per detector")
+    ap.add_argument("--size", default="640x480")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--fast", action="store_true", help="don't pace file/synthetic sources")
+    args = ap.parse_args()
+
+    sources = [int(s) if s.isdigit() else s for s in args.sources]
+    size = tuple(int(v) for v in args.size.split("x"))
+    rt = MultiCamRuntime(sources, size, args.workers, cv_threads=args.cv_threads, realtime=not args.fast)
+    rt.start()
+    while rt.get(timeout=5.0) is None:         # process start-up
+        pass
+    for cam in range(len(sources)):
+        rt.done[cam] = rt.dropped[cam] = rt.torn[cam] = 0
+    t0 = time.perf_counter()
+    latencies = []
+    while time.perf_counter() - t0 < args.seconds:
+        result = rt.get()
+        if result is not None:
+            latencies.append(result[1].latency)
+        elif not rt.capturing:
+            break
+    elapsed = time.perf_counter() - t0
+    total = sum(rt.done)
+    rt.stop()
+    print(f"{len(sources)} cameras, {rt.workers} detector processes x {rt.cv_threads} OpenCV threads")
+    for s in rt.stats():
+        print(f"  cam {s['camera']} ({s['source']}): {s['detected'] / elapsed:.1f} fps detected, "
+              f"{s['dropped']} dropped, {s['torn']} torn")
+    if latencies:
+        print(f"  total {total / elapsed:.1f} fps, latency p50 {np.percentile(latencies, 50) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
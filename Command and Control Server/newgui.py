@@ -13,11 +13,10 @@ import threading
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, QLabel
 )
-from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, Qt
-from PyQt5.QtGui import QPixmap, QImage
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
 import websockets
 import numpy as np
-import cv2
+from video_widget import VideoWidget
 
 # CONFIG
 WS_BIND_HOST = "0.0.0.0"  
@@ -132,10 +131,8 @@ class MainWindow(QWidget):
         # Left panel: Video stream
         left = QVBoxLayout()
         left.addWidget(QLabel("<b>Video Stream</b>"))
-        self.video_label = QLabel()
+        self.video_label = VideoWidget()
         self.video_label.setFixedSize(640, 480)
-        self.video_label.setStyleSheet("background-color: black;")
-        self.video_label.setAlignment(Qt.AlignCenter)
         left.addWidget(self.video_label)
         layout.addLayout(left, 2)
 
@@ -174,13 +171,8 @@ class MainWindow(QWidget):
             self.append_log(f"[INCOMING RAW] {raw}")
 
     def update_frame(self, frame: np.ndarray):
-        """Update the video QLabel with a BGR OpenCV frame"""
-        rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        qimg = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qimg)
-        self.video_label.setPixmap(pixmap)
+        """Show a BGR OpenCV frame; the widget keeps a reference, don't write into it afterwards"""
+        self.video_label.set_frame(frame)
 
     def closeEvent(self, event):
         self.server.stop()
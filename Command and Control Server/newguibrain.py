@@ -1,13 +1,49 @@
-import sys, json, uuid, cv2, numpy as np, time, asyncio, threading
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QTextEdit, QLabel
-from PyQt5.QtGui import QImage, QPixmap
-from PyQt5.QtCore import QTimer, Qt, QObject, pyqtSignal, pyqtSlot
+import sys, json, uuid, cv2, numpy as np, time, asyncio, threading, argparse, queue
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QTextEdit
+from PyQt5.QtCore import Qt, QObject, QEvent, pyqtSignal, pyqtSlot
 import websockets
+from dataclasses import replace
+from capture import PROFILES as CAPTURE_PROFILES, FrameGrabber, mismatches
+from sources import add_source_argument
+from tracking import RoiTracker
+from lockon import LockOnTracker
+from blobs import BACKENDS, blob_arrays, select_backend
+from predictor import TargetPredictor
+from governor import FrameGovernor
+from display import DisplayGate
+from video_widget import VideoWidget
+from overlay import Overlay
+from motion_gate import MotionGate
+from multi_target import MultiTargetTracker
+from multicam import MultiCamRuntime
+from motion_detector import MotionDetector
+from lens import LensModel
+from pipeline import FramePipeline
+from stripes import StripeBlobs, StripeMasker
+from color_lut import LabelLUT
+from detection import MIN_AREA, PROFILES, scale_detection
 
 # CONFIG
 WS_PORT = 8080
 STEP_RADIUS = 50     # pixels tolerance to consider “centered”
 MOVE_SPEED = 2       # degrees per step for directional MOVE
+CAPTURE_PROFILE = "low_latency"  # "default" or "low_latency": MJPG, 1 driver buffer (see capture.py)
+PYRAMID_SCALE = 2    # full-frame searches detect at 1/2 size, refine at full size (1 = off)
+FRAME_BUDGET = 0.030  # s, capture -> result latency the governor tries to hold
+DISPLAY_FPS = 15     # overlays and video refresh rate cap; detection still runs on every frame (0 = no cap)
+LOCKON_DETECT_EVERY = 10  # frames between full detections once locked (1 = always detect)
+DETECTOR = "color"   # "color": HSV profile, "motion": background subtraction (sentry, TARGET_MODE "single" only)
+MOTION_METHOD = "mog2"  # motion detector: "mog2", "knn" or "average" (see motion_detector.py)
+MOTION_SCALE = 2     # motion detector works on a frame shrunk by this factor
+MOTION_LEARNING_RATE = 0.01  # fraction of the background model replaced per frame
+MOTION_WARMUP = 30   # frames the background is learned before anything is reported
+LENS_INTRINSICS = None  # camera JSON from "python lens.py calibrate" (None = ideal pinhole)
+TARGET_MODE = "single" # "single": largest blob, "multi": track every blob with persistent ids
+TARGET_POLICY = "largest"  # multi mode: "largest", "closest", "oldest" (click a target to pin it)
+TARGET_COLORS = ("red",)  # multi mode: profiles from color_profiles.json, all classified in one pass
+BLOB_BACKEND = "auto"  # "contours", "components", "moments" (opt-in: only correct with one red object in view) or "auto" (fastest at startup, see blobs.py)
+STRIPES = 1          # >1: full-frame masks and blobs split into row stripes on threads (see stripes.py)
+MULTICAM_MAX_AGE = 0.2  # s, --cameras mode: older detections from the other cameras are not steered on
 
 # ---------------- WebSocket SERVER -----------------
 class WsServer(QObject):
@@ -18,6 +54,9 @@ class WsServer(QObject):
         self.port = port
         self.loop = asyncio.new_event_loop()
         self.connected_clients = set()
+        # Link latency: MOVE_DIR send -> ACK round trip, halved (EMA, seconds)
+        self.sent_at = {}
+        self.link_latency = 0.0
         self.thread = threading.Thread(target=self.run_loop, daemon=True)
         self.thread.start()
 
@@ -50,6 +89,8 @@ class WsServer(QObject):
                 if data.get("type")=="HELLO":
                     # Simple HELLO ACK response
                     await websocket.send(json.dumps({"type":"HELLO_ACK"}))
+                elif data.get("type")=="ACK":
+                    self.on_ack(data.get("id"))
                 elif data.get("type")=="STATUS":
                     # Simple logging for status updates from ESP32
                     self.sig_log.emit(f"[STATUS] Cmd {data.get('id')} -> {data.get('state')}")
@@ -62,8 +103,17 @@ class WsServer(QObject):
                 self.connected_clients.remove(websocket)
             self.sig_log.emit(f"[DISCONNECT] Client disconnected: {client_ip}")
 
+    def on_ack(self, cmd_id):
+        t_sent = self.sent_at.pop(cmd_id, None)
+        if t_sent is None: return
+        one_way = (time.perf_counter() - t_sent) / 2
+        self.link_latency = one_way if not self.link_latency else 0.8*self.link_latency + 0.2*one_way
+
     def broadcast_json(self, obj):
         msg = json.dumps(obj)
+        if "id" in obj:
+            if len(self.sent_at) > 100: self.sent_at.clear()  # ACKs never came back
+            self.sent_at[obj["id"]] = time.perf_counter()
         # Use a copy of the set in case clients disconnect during broadcast
         for ws in list(self.connected_clients):
             if ws.open:
@@ -76,18 +126,354 @@ class WsServer(QObject):
                     self.sig_log.emit(f"[ERROR] broadcast: {e}")
         self.sig_log.emit(f"[TX] {msg}")
 
-# ---------------- PyQt5 GUI & CV Tracking -----------------
+# ---------------- Steering -----------------
+class SteeringWorker(QObject):
+    """Base of the worker threads: steer() turns one Detection per frame into
+    MOVE_DIR commands (predictor, lens, link latency), display gates drawing.
+    Subclasses provide run(), which calls steer() and emits sig_result."""
+    # (untouched BGR frame, Overlay or None, Detection) -- the widget paints the overlay on top
+    sig_result = pyqtSignal(object, object, object)
+    sig_log = pyqtSignal(str)
+
+    def __init__(self, ws_server, size):
+        super().__init__()
+        self.ws_server = ws_server
+        self.display = DisplayGate(DISPLAY_FPS)  # only frames the operator will see are drawn
+        self.last_track_id = None
+        self.predictor = TargetPredictor()  # steers on where the target will be, not where it was
+        # Steering geometry in ideal pinhole coordinates: only the detected
+        # points are undistorted, the frames stay raw
+        self.lens = LensModel.load(LENS_INTRINSICS, size) if LENS_INTRINSICS else None
+
+        # Tracking State
+        self.last_cx,self.last_cy=None,None
+        self.last_pan_dir,self.last_tilt_dir="NONE","NONE" # Initialize to NONE
+
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+
+    def run(self):
+        raise NotImplementedError
+
+    # Operator clicks; only multi-target mode has targets to pin
+    def pin_at(self, x, y):
+        pass
+
+    def unpin(self):
+        pass
+
+    def steer(self, det, shape):
+        h,w=shape[:2]; center_x,center_y=w//2,h//2
+        if self.lens is not None:
+            # Crosshair and target both mapped onto the ideal pinhole image
+            (center_x,center_y),=self.lens.undistort([(center_x,center_y)])
+            det=self.lens.correct(det)
+        direction="No Target"
+        pan_dir,tilt_dir="NONE","NONE"
+        aim=None
+
+        if det.found:
+            self.last_cx,self.last_cy=det.cx,det.cy
+            if det.track_id != self.last_track_id:
+                self.predictor.reset()  # engaged a different target, don't mix velocities
+                self.last_track_id = det.track_id
+        if self.predictor.update(det):
+            # Aim where the target will be when the command reaches the servo:
+            # pipeline delay (now - capture) plus the measured link latency
+            ax,ay=self.predictor.predict(time.perf_counter()+self.ws_server.link_latency)
+            dx,dy=ax-center_x,ay-center_y
+            if self.lens is not None:
+                (ax,ay),=self.lens.distort([(ax,ay)])  # drawn on the raw frame
+            aim=(int(ax),int(ay))
+
+            # Check if centered within the radius
+            if abs(dx)<STEP_RADIUS and abs(dy)<STEP_RADIUS: 
+                direction="Centered ✅"
+                pan_dir,tilt_dir="NONE","NONE" # Stop movement
+            else:
+                # Determine directional command based on largest offset
+                if abs(dx)>abs(dy): 
+                    pan_dir="LEFT" if dx<0 else "RIGHT"
+                    tilt_dir="NONE"
+                    direction=f"Pan {pan_dir}"
+                else: 
+                    tilt_dir="UP" if dy<0 else "DOWN"
+                    pan_dir="NONE"
+                    direction=f"Tilt {tilt_dir}"
+            if not det.found:
+                direction+=" (predicted)"  # coasting through an occlusion
+
+            # Only send MOVE_DIR if direction has changed
+            if (pan_dir != self.last_pan_dir) or (tilt_dir != self.last_tilt_dir):
+                msg={
+                    "type":"MOVE_DIR",
+                    "id":uuid.uuid4().hex[:12], # Unique ID for the command
+                    "pan_dir":pan_dir,
+                    "tilt_dir":tilt_dir,
+                    "speed":MOVE_SPEED
+                }
+                self.ws_server.broadcast_json(msg)
+                self.last_pan_dir = pan_dir
+                self.last_tilt_dir = tilt_dir
+        return direction, aim
+
+
+# ---------------- CV Tracking Worker -----------------
+class TrackerWorker(SteeringWorker):
+    def __init__(self, grabber, ws_server):
+        super().__init__(ws_server, (grabber.width, grabber.height))
+        self.grabber = grabber
+        if DETECTOR == "motion" and TARGET_MODE == "multi":
+            raise ValueError('DETECTOR = "motion" has no multi-target mode, set TARGET_MODE = "single"')
+        # Stripe mode: same masks and blobs as the serial path, several cores
+        self.stripe_blobs = StripeBlobs(STRIPES) if STRIPES > 1 else None
+        self.trackers = {}
+        self.multi = None
+        if TARGET_MODE == "multi":
+            # Multi-target mode keeps every blob; the policy picks the one to steer on
+            self.multi = MultiTargetTracker()
+            self.multi_mask = FramePipeline(LabelLUT({c: PROFILES[c] for c in TARGET_COLORS}))
+        elif DETECTOR == "motion":
+            # Sentry: anything that moves against the learned background
+            self.trackers = {f: MotionDetector(MOTION_METHOD, MOTION_SCALE, MOTION_LEARNING_RATE,
+                                               MOTION_WARMUP, min_area=MIN_AREA/(f*f)) for f in (1, 2)}
+        else:
+            # One tracker per detection scale (full size, and half size when the
+            # governor sheds load); full-frame search until locked on, then full
+            # detection every LOCKON_DETECT_EVERY frames with CamShift in between
+            masks = [StripeMasker(STRIPES, pool=self.stripe_blobs.pool) if self.stripe_blobs else None for _ in (1, 2)]
+            self.trackers = {1: LockOnTracker(RoiTracker(masks[0], pyramid=PYRAMID_SCALE), detect_every=LOCKON_DETECT_EVERY),
+                             2: LockOnTracker(RoiTracker(masks[1], min_area=MIN_AREA/4), detect_every=LOCKON_DETECT_EVERY)}
+        self.scale = 1
+        self.tracker = self.trackers.get(1)  # None in multi-target mode
+        self.governor = FrameGovernor(FRAME_BUDGET)
+        self.gate = MotionGate()     # reuse the last result while the scene is static
+        self.policy = TARGET_POLICY
+        self.commands = queue.SimpleQueue()  # pin / unpin clicks from the GUI, applied on this thread
+        self.last_det = None
+
+    def select_blob_backend(self):
+        if not self.trackers: return  # multi-target mode extracts every blob with blob_arrays
+        name = BLOB_BACKEND
+        if self.stripe_blobs is not None:
+            for tracker in self.trackers.values():
+                getattr(tracker, "detector", tracker).blob_fn = self.stripe_blobs
+            self.sig_log.emit(f"[TRACKER] Using blob backend: components in {STRIPES} stripes")
+            return
+        if name == "auto":
+            # "moments" merges every red pixel into one centroid, so it is never picked
+            # automatically: the trackers steer on the largest blob of several
+            name, timings = select_backend((self.grabber.height, self.grabber.width))
+            self.sig_log.emit("[TRACKER] Blob backends (ms): " +
+                              ", ".join(f"{k}={v:.3f}" for k, v in timings.items()))
+        for tracker in self.trackers.values():
+            getattr(tracker, "detector", tracker).blob_fn = BACKENDS[name]
+        self.sig_log.emit(f"[TRACKER] Using blob backend: {name}")
+
+    def run(self):
+        self.select_blob_backend()
+        while self.running:
+            item = self.grabber.get(timeout=0.1)
+            if item is None:
+                if not self.grabber.running:
+                    # end of a file or scene: get() no longer waits, don't spin on it
+                    self.sig_log.emit("[CAPTURE] Source ended, tracking stopped")
+                    break
+                continue  # no new frame yet
+            self.process_frame(item)
+
+    def process_frame(self, item):
+        gov = self.governor
+        if gov.skip(item.frame_id): return  # shedding load: every other frame
+
+        t0 = time.perf_counter()
+        det = self.detect(item)
+        t1 = time.perf_counter()
+        direction, aim = self.steer(det, item.image.shape)
+        t2 = time.perf_counter()
+        if self.display.due(t2):
+            overlay = None
+            if gov.draw_overlay:
+                tracks = self.multi.visible_tracks() if self.multi is not None else None
+                overlay = build_overlay(item.image.shape, det, direction, aim, tracks)
+            t3 = time.perf_counter()
+            self.sig_result.emit(item.image, overlay, det)  # the frame itself is never drawn into
+            t4 = time.perf_counter()
+            gov.record("overlay", t3-t2); gov.record("display", t4-t3)
+        else:
+            t4 = t2  # not shown: no drawing
+
+        gov.record("detect", t1-t0); gov.record("control", t2-t1)
+        change = gov.end_frame(t4-item.t_capture)
+        if change:
+            self.sig_log.emit(f"[GOVERNOR] {change}")
+            if gov.scale != self.scale:
+                # Detection resolution changed: start the new tracker from scratch
+                self.scale = gov.scale
+                if self.tracker is not None:
+                    self.tracker = self.trackers[self.scale]
+                    self.tracker.reset()
+                self.gate.reset()
+
+    def detect(self, item):
+        changed = self.apply_commands()
+        if not self.gate.changed(item.image) and self.last_det is not None and not changed:
+            # Scene unchanged: the last detection still holds for this frame
+            self.last_det = replace(self.last_det, frame_id=item.frame_id,
+                                    t_capture=item.t_capture, t_done=time.perf_counter())
+            return self.last_det
+        self.last_det = self.run_tracker(item)
+        return self.last_det
+
+    def run_tracker(self, item):
+        if self.multi is not None:
+            return self.run_multi(item)
+        if self.scale == 1:
+            return self.tracker.update(item.image, item.frame_id, item.t_capture)
+        small = cv2.resize(item.image, None, fx=1/self.scale, fy=1/self.scale,
+                           interpolation=cv2.INTER_AREA)
+        det = self.tracker.update(small, item.frame_id, item.t_capture)
+        return scale_detection(det, self.scale)
+
+    def run_multi(self, item):
+        image,f=item.image,self.scale
+        if f > 1:
+            image = cv2.resize(image, None, fx=1/f, fy=1/f, interpolation=cv2.INTER_AREA)
+        arrays=self.stripe_blobs.arrays if self.stripe_blobs is not None else blob_arrays
+        blobs=[arrays(mask, MIN_AREA/(f*f)) for mask in self.multi_mask.masks(image).values()]
+        centroids,bboxes,areas=(np.concatenate(a) for a in zip(*blobs))
+        classes=np.repeat(np.arange(len(blobs)), [len(b[2]) for b in blobs])
+        self.multi.update(centroids*f, bboxes*f, areas*f*f, classes)
+        h,w=item.image.shape[:2]
+        i=self.multi.select(self.policy,(w//2,h//2))
+        return self.multi.detection(i, item.frame_id, item.t_capture)
+
+    # Called from the GUI thread: the tracker belongs to the worker thread,
+    # so clicks are only queued here and applied in apply_commands()
+    def pin_at(self, x, y):
+        if self.multi is not None: self.commands.put(("pin", x, y))
+
+    def unpin(self):
+        if self.multi is not None: self.commands.put(("unpin",))
+
+    def apply_commands(self):
+        applied = False
+        while not self.commands.empty():
+            cmd = self.commands.get()
+            applied = True
+            if cmd[0] == "pin":
+                # Operator clicked a target: engage that track until it is lost
+                track_id = self.multi.pin_at(*cmd[1:])
+                if track_id is not None:
+                    self.policy = "pinned"
+                    self.sig_log.emit(f"[TRACKER] Pinned track #{track_id}")
+            else:
+                self.multi.pinned_id = None
+                self.policy = TARGET_POLICY
+                self.sig_log.emit(f"[TRACKER] Unpinned, policy: {self.policy}")
+        return applied
+
+
+# ---------------- Multi-camera Worker -----------------
+class MultiCamWorker(SteeringWorker):
+    """--cameras mode: detection runs in multicam.py processes, this thread merges
+    their results into the same steering (MOVE_DIR) and display path.
+
+    The cameras are assumed to look along the turret axis (e.g. a wide and a
+    narrow lens next to each other), so an offset from the center of any
+    camera's frame maps to the same pan/tilt direction. Camera 0 steers while
+    it sees the target; otherwise the largest target another camera saw in the
+    last MULTICAM_MAX_AGE s does.
+    """
+
+    def __init__(self, runtime, ws_server):
+        super().__init__(ws_server, runtime.size)
+        self.runtime = runtime
+        self.steering_cam = 0
+
+    def choose_camera(self):
+        now = time.perf_counter()
+        found = {cam: det for cam, det in self.runtime.latest.items()
+                 if det.found and now - det.t_capture < MULTICAM_MAX_AGE}
+        if not found or 0 in found:
+            return 0
+        return max(found, key=lambda cam: found[cam].area)
+
+    def run(self):
+        w,h = self.runtime.size
+        while self.running:
+            result = self.runtime.get(timeout=0.1)
+            if result is None: continue  # nothing new, or a torn frame
+            cam, det = result
+            if cam != self.choose_camera(): continue  # another camera steers
+            if cam != self.steering_cam:
+                self.sig_log.emit(f"[MULTICAM] Steering on camera {cam}")
+                self.steering_cam = cam
+            det.track_id = cam  # a camera switch restarts the predictor
+            direction, aim = self.steer(det, (h, w))
+            if self.display.due(time.perf_counter()):
+                frame = self.runtime.frame(cam, det)
+                if frame is not None:
+                    overlay = build_overlay(frame.shape, det, f"{direction} [cam {cam}]", aim)
+                    self.sig_result.emit(frame, overlay, det)
+
+
+def build_overlay(shape, det, direction, aim=None, tracks=None):
+    h,w=shape[:2]
+    ov=Overlay(meta={"frame_id":det.frame_id,"direction":direction,"found":det.found,
+                     "target":(det.cx,det.cy) if det.found else None,"track_id":det.track_id})
+    if det.contour is not None:
+        ov.contour(det.contour,(0,255,0),1)
+
+    # Center crosshair
+    ov.circle((w//2,h//2),6,(0,255,255))
+
+    if det.roi is not None:
+        # Tracking window searched this frame
+        x0,y0,x1,y1=det.roi
+        ov.rect(x0,y0,x1-x0,y1-y0,(128,128,128),1)
+
+    for track_id,(x,y,w_box,h_box),cls in tracks or ():
+        # Every tracked blob with its persistent id (and color with several profiles)
+        label=f"#{track_id}" if len(TARGET_COLORS)==1 else f"#{track_id} {TARGET_COLORS[cls]}"
+        ov.rect(x,y,w_box,h_box,(0,255,0),1)
+        ov.text((x,y-4),label,(0,255,0),0.4,1)
+
+    if det.found:
+        # Bounding box and centroid
+        x,y,w_box,h_box=det.bbox
+        ov.rect(x,y,w_box,h_box,(255,0,0),2)
+        ov.circle((det.cx,det.cy),6,(0,0,255))
+
+    if aim is not None:
+        # Predicted aim point
+        ov.circle(aim,8,(255,0,255),2)
+
+    # Current tracking status
+    ov.text((20,30),direction,(255,255,255),1,2)
+    return ov
+
+# ---------------- PyQt5 GUI -----------------
 class MainWindow(QWidget):
-    def __init__(self):
+    def __init__(self, source="0", realtime=True, cameras=None):
         super().__init__()
         self.setWindowTitle("Red Object Tracker (Server Mode)")
         self.setGeometry(200,100,700,600)
         self.vbox = QVBoxLayout(); self.setLayout(self.vbox)
         
         # Video Display
-        self.video_label = QLabel(); 
+        self.video_label = VideoWidget(); 
         self.video_label.setFixedSize(640,480); 
-        self.video_label.setAlignment(Qt.AlignCenter)
         self.vbox.addWidget(self.video_label)
         
         # Log Console
@@ -100,113 +486,59 @@ class MainWindow(QWidget):
         self.ws_server = WsServer(WS_PORT); 
         self.ws_server.sig_log.connect(self.append_log)
         
-        # Camera Setup
-        self.cap = cv2.VideoCapture(0); 
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH,640); 
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT,480)
-        
-        # Tracking State
-        self.last_cx,self.last_cy=None,None
-        self.last_pan_dir,self.last_tilt_dir="NONE","NONE" # Initialize to NONE
-        
-        # Timer for Frame Update
-        self.timer = QTimer(); 
-        self.timer.timeout.connect(self.update_frame); 
-        self.timer.start(30) # ~33 FPS
-
-    @pyqtSlot()
-    def update_frame(self):
-        ret, frame = self.cap.read()
-        if not ret: return
-        
-        # Image Processing for Red Tracking
-        frame_blur = cv2.GaussianBlur(frame,(7,7),0)
-        hsv=cv2.cvtColor(frame_blur,cv2.COLOR_BGR2HSV)
-        h,w,_=frame.shape; center_x,center_y=w//2,h//2
-        
-        # Red color range definition (two ranges needed for Hue wrap-around)
-        lower_red1=np.array([0,80,50]); upper_red1=np.array([10,255,255])
-        lower_red2=np.array([170,100,50]); upper_red2=np.array([180,255,255])
-        mask1=cv2.inRange(hsv,lower_red1,upper_red1); mask2=cv2.inRange(hsv,lower_red2,upper_red2)
-        mask=cv2.bitwise_or(mask1,mask2)
-        
-        # Morphological operations for noise reduction
-        kernel=np.ones((5,5),np.uint8); 
-        mask=cv2.morphologyEx(mask,cv2.MORPH_CLOSE,kernel); 
-        mask=cv2.morphologyEx(mask,cv2.MORPH_OPEN,kernel)
-        
-        # Find contours
-        contours,_=cv2.findContours(mask,cv2.RETR_EXTERNAL,cv2.CHAIN_APPROX_SIMPLE)
-        
-        target_contour=None; max_area=0
-        for contour in contours:
-            area=cv2.contourArea(contour)
-            # Find the largest contour over a minimum size
-            if area>300 and area>max_area: 
-                max_area=area
-                target_contour=contour
-                cv2.drawContours(frame,[contour],-1,(0,255,0),1)
-                
-        # Draw center crosshair
-        cv2.circle(frame,(center_x,center_y),6,(0,255,255),-1)
-        
-        direction="No Target"
-        pan_dir,tilt_dir="NONE","NONE"
-        cx,cy=None,None
-        
-        if target_contour is not None:
-            # Draw bounding box
-            x,y,w_box,h_box=cv2.boundingRect(target_contour)
-            cv2.rectangle(frame,(x,y),(x+w_box,y+h_box),(255,0,0),2)
-            
-            # Calculate centroid
-            M=cv2.moments(target_contour)
-            if M["m00"]!=0:
-                cx=int(M["m10"]/M["m00"])
-                cy=int(M["m01"]/M["m00"])
-                self.last_cx,self.last_cy=cx,cy
-                
-                cv2.circle(frame,(cx,cy),6,(0,0,255),-1)
-                
-                dx,dy=cx-center_x,cy-center_y
-                
-                # Check if centered within the radius
-                if abs(dx)<STEP_RADIUS and abs(dy)<STEP_RADIUS: 
-                    direction="Centered ✅"
-                    pan_dir,tilt_dir="NONE","NONE" # Stop movement
-                else:
-                    # Determine directional command based on largest offset
-                    if abs(dx)>abs(dy): 
-                        pan_dir="LEFT" if dx<0 else "RIGHT"
-                        tilt_dir="NONE"
-                        direction=f"Pan {pan_dir}"
-                    else: 
-                        tilt_dir="UP" if dy<0 else "DOWN"
-                        pan_dir="NONE"
-                        direction=f"Tilt {tilt_dir}"
-                
-                # Only send MOVE_DIR if direction has changed
-                if (pan_dir != self.last_pan_dir) or (tilt_dir != self.last_tilt_dir):
-                    msg={
-                        "type":"MOVE_DIR",
-                        "id":uuid.uuid4().hex[:12], # Unique ID for the command
-                        "pan_dir":pan_dir,
-                        "tilt_dir":tilt_dir,
-                        "speed":MOVE_SPEED
-                    }
-                    self.ws_server.broadcast_json(msg)
-                    self.last_pan_dir = pan_dir
-                    self.last_tilt_dir = tilt_dir
-
-        # Display the current tracking status
-        cv2.putText(frame,direction,(20,30),cv2.FONT_HERSHEY_SIMPLEX,1,(255,255,255),2)
-        
-        # Convert OpenCV frame to QPixmap for PyQt display
-        rgb=cv2.cvtColor(frame,cv2.COLOR_BGR2RGB); 
-        h,w,ch=rgb.shape; 
-        bytesPerLine=ch*w
-        qt_img=QImage(rgb.data,w,h,bytesPerLine,QImage.Format_RGB888); 
-        self.video_label.setPixmap(QPixmap.fromImage(qt_img))
+        self.grabber = self.runtime = None
+        if cameras:
+            # Multi-camera mode: capture and detection in processes (multicam.py)
+            self.runtime = MultiCamRuntime(cameras, realtime=realtime)
+            self.runtime.start()
+            self.append_log(f"[MULTICAM] {len(cameras)} cameras, {self.runtime.workers} detector processes")
+            self.worker = MultiCamWorker(self.runtime, self.ws_server)
+        else:
+            # Camera Setup (reads run on the grabber thread, never on the GUI thread)
+            self.grabber = FrameGrabber(source, profile=CAPTURE_PROFILES[CAPTURE_PROFILE], realtime=realtime)
+            self.grabber.start()
+            self.append_log(f"[CAPTURE] {CAPTURE_PROFILE}: " +
+                            ", ".join(f"{k}={v[1]}" for k, v in self.grabber.negotiated.items()))
+            for line in mismatches(self.grabber.negotiated):
+                self.append_log(f"[CAPTURE] Not granted by the camera: {line}")
+
+            # Detection + control run on the worker thread; results arrive as signals
+            self.worker = TrackerWorker(self.grabber, self.ws_server)
+        self.worker.sig_result.connect(self.show_result)
+        self.worker.sig_log.connect(self.append_log)
+        self.worker.start()
+
+        # Multi-target mode: left click pins a target, right click unpins
+        self.video_label.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.video_label and event.type()==QEvent.MouseButtonPress:
+            pos=self.video_label.frame_pos(event.x(), event.y())
+            if event.button()==Qt.LeftButton and pos is not None:
+                self.worker.pin_at(*pos)
+            elif event.button()==Qt.RightButton:
+                self.worker.unpin()
+            return True
+        return super().eventFilter(obj, event)
+
+    # Frames are only drawn while the window can be seen
+    def showEvent(self, event):
+        self.worker.display.visible = not self.isMinimized()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.worker.display.visible = False
+        super().hideEvent(event)
+
+    def changeEvent(self, event):
+        if event.type()==QEvent.WindowStateChange:
+            self.worker.display.visible = self.isVisible() and not self.isMinimized()
+        super().changeEvent(event)
+
+    @pyqtSlot(object, object, object)
+    def show_result(self, frame, overlay, det):
+        # The widget paints the BGR frame directly (no conversion or copy) and the overlay on top
+        self.video_label.set_frame(frame, overlay)
 
     @pyqtSlot(str)
     def append_log(self,msg): 
@@ -218,12 +550,30 @@ class MainWindow(QWidget):
 
     # Clean up the camera and server on window close
     def closeEvent(self, event):
-        self.cap.release()
+        self.worker.stop()
+        if self.runtime is not None:
+            self.runtime.stop()
+            print(f"[MULTICAM] {self.runtime.stats()}")
+        else:
+            self.grabber.stop()
+            print(f"[CAPTURE] {self.grabber.stats()}")
+            if self.worker.tracker is not None:
+                print(f"[TRACKING] {self.worker.tracker.stats()}")
+            print(f"[GOVERNOR] {self.worker.governor.stats()}")
+            print(f"[MOTION GATE] {self.worker.gate.stats()}")
+        print(f"[DISPLAY] {self.worker.display.stats()}")
         self.ws_server.loop.call_soon_threadsafe(self.ws_server.loop.stop)
         self.ws_server.thread.join(timeout=1)
         super().closeEvent(event)
 
 if __name__=="__main__":
-    app=QApplication(sys.argv)
-    win=MainWindow(); win.show()
+    ap=argparse.ArgumentParser(description="Red object tracker (server mode)")
+    add_source_argument(ap)
+    ap.add_argument("--cameras", nargs="+", metavar="SOURCE",
+                    help="multi-camera mode: detect on every source in its own process, "
+                         "steer on camera 0 first (see multicam.py)")
+    args,qt_args=ap.parse_known_args()
+    app=QApplication(sys.argv[:1]+qt_args)
+    cameras=[int(s) if s.isdigit() else s for s in args.cameras or ()]
+    win=MainWindow(args.source, realtime=not args.fast, cameras=cameras); win.show()
     sys.exit(app.exec_())
@@ -1,17 +1,20 @@
 import sys
 import json
 import uuid
-import cv2
-import numpy as np
 import time
 import asyncio
 import threading
+import argparse
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QTextEdit, QLabel
+    QApplication, QWidget, QVBoxLayout, QTextEdit
 )
-from PyQt5.QtGui import QImage, QPixmap
-from PyQt5.QtCore import QTimer, Qt, QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QTimer, QObject, pyqtSignal, pyqtSlot
 import websockets
+from tracking import RoiTracker
+from capture import CaptureProfile
+from sources import add_source_argument, open_source
+from video_widget import VideoWidget
+from overlay import Overlay
 
 # CONFIG
 WS_HOST = "ws://127.0.0.1:8080"  # adjust to your server
@@ -49,7 +52,7 @@ class WsClient(QObject):
 
 # ---------------- Main GUI -----------------
 class MainWindow(QWidget):
-    def __init__(self):
+    def __init__(self, source="0", fast=False):
         super().__init__()
         self.setWindowTitle("Red Object Tracker")
         self.setGeometry(200, 100, 700, 600)
@@ -58,9 +61,8 @@ class MainWindow(QWidget):
         self.setLayout(self.vbox)
 
         # Video display
-        self.video_label = QLabel()
+        self.video_label = VideoWidget()
         self.video_label.setFixedSize(640, 480)
-        self.video_label.setAlignment(Qt.AlignCenter)
         self.vbox.addWidget(self.video_label)
 
         # Log view
@@ -73,17 +75,18 @@ class MainWindow(QWidget):
         self.ws_client.sig_log.connect(self.append_log)
 
         # Video capture
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        # Video source (camera, file, image directory or synthetic scene);
+        # the timer below does the pacing
+        self.cap = open_source(source, realtime=False, profile=CaptureProfile(640, 480))
 
+        self.tracker = RoiTracker()
         self.last_cx, self.last_cy = None, None
         self.last_pan_dir, self.last_tilt_dir = None, None
 
         # Timer to grab frames
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
-        self.timer.start(30)  # ~33 fps
+        self.timer.start(0 if fast else 30)  # ~33 fps
 
     @pyqtSlot()
     def update_frame(self):
@@ -91,73 +94,49 @@ class MainWindow(QWidget):
         if not ret:
             return
 
-        frame_blur = cv2.GaussianBlur(frame, (7, 7), 0)
-        hsv = cv2.cvtColor(frame_blur, cv2.COLOR_BGR2HSV)
         h, w, _ = frame.shape
         center_x, center_y = w // 2, h // 2
 
-        # Relaxed red thresholds
-        lower_red1 = np.array([0, 80, 50])
-        upper_red1 = np.array([10, 255, 255])
-        lower_red2 = np.array([170, 100, 50])
-        upper_red2 = np.array([180, 255, 255])
-
-        mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-        mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
-        mask = cv2.bitwise_or(mask1, mask2)
-
-        kernel = np.ones((5,5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        target_contour = None
-        max_area = 0
-
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 300:  # lowered area threshold
-                if area > max_area:
-                    max_area = area
-                    target_contour = contour
-                cv2.drawContours(frame, [contour], -1, (0, 255, 0), 1)
+        # Relaxed red thresholds (detection.py), searched only around the
+        # last known position once the target is locked
+        det = self.tracker.update(frame)
+        # Drawn by the video widget on top of the frame; the frame stays untouched
+        overlay = Overlay(meta={"frame_id": det.frame_id, "found": det.found})
+        if det.found:
+            overlay.contour(det.contour, (0, 255, 0), 1)
 
         # Draw camera center
-        cv2.circle(frame, (center_x, center_y), 6, (0, 255, 255), -1)
+        overlay.circle((center_x, center_y), 6, (0, 255, 255))
 
         direction = "No Target"
         pan_dir, tilt_dir = "NONE", "NONE"
         cx, cy = None, None
 
-        if target_contour is not None:
-            x, y, w_box, h_box = cv2.boundingRect(target_contour)
-            cv2.rectangle(frame, (x, y), (x + w_box, y + h_box), (255, 0, 0), 2)
+        if det.found:
+            x, y, w_box, h_box = det.bbox
+            overlay.rect(x, y, w_box, h_box, (255, 0, 0), 2)
 
-            M = cv2.moments(target_contour)
-            if M["m00"] != 0:
-                cx = int(M["m10"] / M["m00"])
-                cy = int(M["m01"] / M["m00"])
-                self.last_cx, self.last_cy = cx, cy
-                cv2.circle(frame, (cx, cy), 6, (0, 0, 255), -1)
+            cx, cy = det.cx, det.cy
+            self.last_cx, self.last_cy = cx, cy
+            overlay.circle((cx, cy), 6, (0, 0, 255))
 
-                dx, dy = cx - center_x, cy - center_y
+            dx, dy = cx - center_x, cy - center_y
 
-                if abs(dx) < STEP_RADIUS and abs(dy) < STEP_RADIUS:
-                    direction = "Centered ✅"
-                elif abs(dx) > abs(dy):
-                    pan_dir = "LEFT" if dx < 0 else "RIGHT"
-                    direction = f"⬅ Move LEFT" if dx < 0 else "➡ Move RIGHT"
-                else:
-                    tilt_dir = "DOWN" if dy < 0 else "UP"
-                    direction = f"⬇ Move DOWN" if dy < 0 else "⬆ Move UP"
+            if abs(dx) < STEP_RADIUS and abs(dy) < STEP_RADIUS:
+                direction = "Centered ✅"
+            elif abs(dx) > abs(dy):
+                pan_dir = "LEFT" if dx < 0 else "RIGHT"
+                direction = f"⬅ Move LEFT" if dx < 0 else "➡ Move RIGHT"
+            else:
+                tilt_dir = "DOWN" if dy < 0 else "UP"
+                direction = f"⬇ Move DOWN" if dy < 0 else "⬆ Move UP"
 
         elif self.last_cx is not None:
-            cv2.circle(frame, (self.last_cx, self.last_cy), 6, (255, 255, 0), -1)
-            cv2.putText(frame, "Last seen", (self.last_cx-40, self.last_cy-15),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,0), 2)
+            overlay.circle((self.last_cx, self.last_cy), 6, (255, 255, 0))
+            overlay.text((self.last_cx-40, self.last_cy-15), "Last seen", (255,255,0), 0.5, 2)
 
-        cv2.putText(frame, direction, (30,50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,255,255), 2, cv2.LINE_AA)
+        overlay.text((30,50), direction, (0,255,255), 0.8, 2)
+        overlay.meta["direction"] = direction
 
         # Send MOVE_DIR only if changed
         if (pan_dir != self.last_pan_dir) or (tilt_dir != self.last_tilt_dir):
@@ -172,12 +151,8 @@ class MainWindow(QWidget):
             self.last_pan_dir = pan_dir
             self.last_tilt_dir = tilt_dir
 
-        # Display frame in QLabel
-        rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        qt_img = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        self.video_label.setPixmap(QPixmap.fromImage(qt_img))
+        # Display the BGR frame as is (no conversion or copy), overlay on top
+        self.video_label.set_frame(frame, overlay)
 
     @pyqtSlot(str)
     def append_log(self, text):
@@ -189,8 +164,11 @@ class MainWindow(QWidget):
 
 # ---------------- Entry -----------------
 def main():
-    app = QApplication(sys.argv)
-    w = MainWindow()
+    ap = argparse.ArgumentParser(description="Red object tracker")
+    add_source_argument(ap)
+    args, qt_args = ap.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
+    w = MainWindow(args.source, args.fast)
     w.show()
     sys.exit(app.exec_())
 
@@ -0,0 +1,92 @@
+"""
+overlay.py
+Overlay model: what the operator sees on top of a frame, kept apart from the frame.
+
+The trackers used to draw crosshair, contours, boxes and text into the
+captured frame, which made every frame private to the GUI. Now they build
+an Overlay (a list of shapes in frame pixel coordinates plus the detection
+metadata it was made from) and the frame stays untouched, so the same
+array can go to the detector, a recorder or a streamer without a copy.
+
+    VideoWidget.set_frame(frame, overlay)   painted by Qt on top of the frame
+    overlay.burn(frame.copy())              rendered with OpenCV, e.g. for recordings
+
+Colors are BGR tuples, as everywhere else in the OpenCV code. Text
+positions are the baseline start, as in cv2.putText; `scale` is the
+cv2.FONT_HERSHEY_SIMPLEX font scale.
+"""
+
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class Circle:
+    center: tuple
+    radius: int
+    color: tuple
+    thickness: int = -1               # -1 = filled
+
+
+@dataclass
+class Rect:
+    x: int
+    y: int
+    w: int
+    h: int
+    color: tuple
+    thickness: int = 1
+
+
+@dataclass
+class Contour:
+    points: np.ndarray                # (N, 1, 2) as returned by cv2.findContours
+    color: tuple
+    thickness: int = 1
+
+
+@dataclass
+class Text:
+    pos: tuple
+    text: str
+    color: tuple
+    scale: float = 0.5
+    thickness: int = 1
+
+
+@dataclass
+class Overlay:
+    shapes: list = field(default_factory=list)
+    meta: dict = field(default_factory=dict)  # detection metadata, e.g. frame_id, target, direction
+
+    def circle(self, center, radius, color, thickness=-1):
+        self.shapes.append(Circle(tuple(int(v) for v in center), int(radius), color, thickness))
+        return self
+
+    def rect(self, x, y, w, h, color, thickness=1):
+        self.shapes.append(Rect(int(x), int(y), int(w), int(h), color, thickness))
+        return self
+
+    def contour(self, points, color, thickness=1):
+        self.shapes.append(Contour(points, color, thickness))
+        return self
+
+    def text(self, pos, text, color, scale=0.5, thickness=1):
+        self.shapes.append(Text(tuple(int(v) for v in pos), text, color, scale, thickness))
+        return self
+
+    def burn(self, frame):
+        """Draw the shapes into `frame` with OpenCV and return it (pass a copy to keep the original)."""
+        for s in self.shapes:
+            if isinstance(s, Circle):
+                cv2.circle(frame, s.center, s.radius, s.color, s.thickness)
+            elif isinstance(s, Rect):
+                cv2.rectangle(frame, (s.x, s.y), (s.x + s.w, s.y + s.h), s.color, s.thickness)
+            elif isinstance(s, Contour):
+                cv2.drawContours(frame, [s.points], -1, s.color, s.thickness)
+            elif isinstance(s, Text):
+                cv2.putText(frame, s.text, s.pos, cv2.FONT_HERSHEY_SIMPLEX, s.scale, s.color,
+                            s.thickness, cv2.LINE_AA)
+        return frame
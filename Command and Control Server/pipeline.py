@@ -0,0 +1,70 @@
+"""
+pipeline.py
+Red-mask pipeline that reuses its buffers instead of allocating per frame.
+
+Every OpenCV stage writes into a buffer owned by the pipeline (dst=...).
+Buffers are kept per stage name and only grow: a request for a smaller shape
+(e.g. an ROI crop) gets a contiguous view into the existing buffer, so after
+the first full-size frame the steady state allocates no image memory.
+
+With a LabelLUT, masks() classifies a frame against every profile in a
+single blur + HSV pass and only repeats the (cheap) morphology per color.
+
+A FramePipeline is not thread-safe and the mask it returns is only valid
+until the next call; use one pipeline per worker thread.
+"""
+
+import cv2
+import numpy as np
+
+from detection import KERNEL, RED_LUT
+
+
+class FramePipeline:
+    def __init__(self, lut=RED_LUT, kernel=KERNEL):
+        self.lut = lut
+        self.kernel = kernel
+        self._buffers = {}           # stage name -> flat backing store
+        self.allocations = 0         # backing store (re)allocations so far
+
+    def buffer(self, name, shape, dtype=np.uint8):
+        """Contiguous array of `shape` backed by the `name` store."""
+        size = int(np.prod(shape))
+        store = self._buffers.get(name)
+        if store is None or store.size < size:
+            store = self._buffers[name] = np.empty(size, dtype)
+            self.allocations += 1
+        return store[:size].reshape(shape)
+
+    def shrink(self, frame, scale):
+        h, w = frame.shape[:2]
+        dst = self.buffer("small", (h // scale, w // scale, 3))
+        return cv2.resize(frame, (w // scale, h // scale), dst=dst,
+                          interpolation=cv2.INTER_AREA)
+
+    def classify(self, frame, name="mask"):
+        """Blurred frame classified by color, into the `name` buffer."""
+        h, w = frame.shape[:2]
+        blur = self.buffer("blur", (h, w, 3))
+        out = self.buffer(name, (h, w))
+        cv2.GaussianBlur(frame, (7, 7), 0, dst=blur)
+        return self.lut.mask(blur, out=out, scratch=self.buffer("hsv", (h, w, 4)))
+
+    def clean(self, mask):
+        # Morphological operations for noise reduction, ping-ponging buffers
+        tmp = self.buffer("morph", mask.shape)
+        cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel, dst=tmp)
+        cv2.morphologyEx(tmp, cv2.MORPH_OPEN, self.kernel, dst=mask)
+        return mask
+
+    def mask(self, frame):
+        return self.clean(self.classify(frame))
+
+    __call__ = mask
+
+    def masks(self, frame):
+        """{profile name: cleaned mask} for every profile of the LabelLUT."""
+        labels = self.classify(frame, "labels")
+        # profile names are user-defined, keep them apart from the stage buffer names
+        return {name: self.clean(self.lut.select(labels, name, out=self.buffer(f"profile:{name}", labels.shape)))
+                for name in self.lut.names}
@@ -0,0 +1,81 @@
+"""
+predictor.py
+Predictive target tracker with latency compensation.
+
+A constant-velocity Kalman filter per image axis estimates the target
+position and velocity from the centroid stream, using the capture timestamp
+of every Detection so irregular frame intervals are handled correctly.
+
+predict(t) extrapolates to any time, e.g. the moment a MOVE_DIR sent now
+will reach the servo (now + link latency). When detections stop, the filter
+keeps coasting on its velocity for up to `max_coast` seconds so short
+occlusions do not drop the track.
+"""
+
+
+class _Axis:
+    """Kalman filter with state (position, velocity) for one axis."""
+
+    def __init__(self, z, meas_var, vel_var):
+        self.p, self.v = float(z), 0.0
+        # covariance [[a, b], [b, c]]
+        self.a, self.b, self.c = meas_var, 0.0, vel_var
+
+    def predict(self, dt, q):
+        self.p += self.v * dt
+        dt2 = dt * dt
+        self.a += 2 * dt * self.b + dt2 * self.c + q * dt2 * dt2 / 4
+        self.b += dt * self.c + q * dt2 * dt / 2
+        self.c += q * dt2
+
+    def correct(self, z, r):
+        s = self.a + r
+        k1, k2 = self.a / s, self.b / s
+        y = z - self.p
+        self.p += k1 * y
+        self.v += k2 * y
+        self.a, self.b, self.c = (1 - k1) * self.a, (1 - k1) * self.b, self.c - k2 * self.b
+
+
+class TargetPredictor:
+    def __init__(self, accel_noise=3000.0, meas_noise=3.0, max_coast=0.4):
+        self.q = accel_noise ** 2      # (px/s²)² process noise
+        self.r = meas_noise ** 2       # px² centroid measurement noise
+        self.max_coast = max_coast     # s to keep a track without detections
+        self.x = self.y = None         # _Axis filters, None = no track
+        self.t = 0.0                   # time of the filter state
+        self.t_seen = 0.0              # capture time of the last detection
+
+    def reset(self):
+        self.x = self.y = None
+
+    @property
+    def tracking(self):
+        return self.x is not None
+
+    @property
+    def velocity(self):
+        return (self.x.v, self.y.v) if self.tracking else (0.0, 0.0)
+
+    def update(self, det):
+        """Feed one Detection (found or not). Returns True while a track exists."""
+        t = det.t_capture
+        if det.found:
+            if not self.tracking:
+                self.x = _Axis(det.cx, self.r, 500.0 ** 2)
+                self.y = _Axis(det.cy, self.r, 500.0 ** 2)
+            else:
+                dt = max(0.0, t - self.t)
+                self.x.predict(dt, self.q); self.y.predict(dt, self.q)
+                self.x.correct(det.cx, self.r); self.y.correct(det.cy, self.r)
+            self.t = self.t_seen = t
+        elif self.tracking and t - self.t_seen > self.max_coast:
+            self.x = self.y = None     # occluded for too long, drop the track
+        return self.tracking
+
+    def predict(self, t):
+        """Estimated (x, y) at time `t` (perf_counter seconds), None without a track."""
+        if not self.tracking:
+            return None
+        dt = t - self.t
+        return self.x.p + self.x.v * dt, self.y.p + self.y.v * dt
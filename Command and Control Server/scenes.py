@@ -0,0 +1,237 @@
+"""
+scenes.py
+Synthetic scenes with ground truth, for benchmarking without a camera.
+
+A Scene renders red targets (and optional near-red decoys that no red
+profile should accept) over a cluttered background, with sensor noise and
+a slow lighting drift, and reports per frame where every target really is:
+centroid, bbox (clipped to the frame) and whether it is visible at all.
+
+Frames are produced in batches. Positions, lighting and ground truth of a
+whole batch are computed as arrays, and the background at every frame's
+lighting level (17 precomputed levels) comes with the noise in one
+saturating cv2.add per frame: the levels are stored darkened by the noise
+offset and the noise bank (generated once) holds offset + gaussian noise,
+so a single unsigned add applies zero-mean noise. Only the small target
+stamps are written per target (one add and one masked copy), so the generator stays far above the
+detector's frame rate:
+
+    python scenes.py                             # generator fps per resolution
+    python scenes.py --targets 3 --decoys 2 --show
+
+Trajectories (Target.path), all at Target.speed px/frame:
+
+    bounce     straight line reflected at the frame edges
+    linear     straight line, leaves the frame (visible becomes False)
+    circle     circle around the frame center
+    lissajous  figure-eight over most of the frame
+"""
+
+import argparse
+import time
+from collections import namedtuple
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+
+# Arrays for a batch of n frames with k targets:
+#   frame_id (n,), centroid (n, k, 2) float, bbox (n, k, 4) int (x, y, w, h) clipped to
+#   the frame, visible (n, k) bool: the center is inside the frame (about half the target shows)
+GroundTruth = namedtuple("GroundTruth", "frame_id centroid bbox visible")
+
+TARGET_BGR = (30, 30, 220)            # inside every red profile of color_profiles.json
+DECOY_BGR = ((0, 140, 255), (180, 60, 230))   # orange and pink: near red, outside the profiles
+
+
+def synthetic_background(w, h, seed=0, clutter=20):
+    """Noisy background with non-red clutter (also used by bench_pyramid.synthetic_frames)."""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 120, (h, w, 3), dtype=np.uint8)
+    for _ in range(clutter):  # non-red clutter
+        x, y = int(rng.integers(0, w)), int(rng.integers(0, h))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        if color[2] > 150 and color[1] < 100 and color[0] < 100:
+            continue  # keep the distractors out of the red range
+        cv2.rectangle(background, (x, y), (x + 40, y + 30), color, -1)
+    return background
+
+
+@dataclass
+class Target:
+    radius: int = 20
+    speed: float = 4.0                # px/frame along the path
+    path: str = "bounce"              # "bounce", "linear", "circle" or "lissajous"
+    start: tuple = None               # (x, y) at frame 0; None: random
+    heading: float = None             # rad, for bounce / linear; None: random
+    color: tuple = TARGET_BGR
+
+
+@dataclass
+class Scene:
+    width: int = 640
+    height: int = 480
+    targets: list = field(default_factory=lambda: [Target()])
+    decoys: list = field(default_factory=list)   # drawn like targets, not in the ground truth
+    noise: float = 6.0                # std of the per-pixel sensor noise (levels)
+    drift: float = 0.2                # lighting gain amplitude, gain = 1 + drift * sin(...)
+    drift_period: int = 300           # frames per lighting cycle
+    clutter: int = 20                 # static non-red boxes in the background
+    seed: int = 0
+
+    def __post_init__(self):
+        rng = np.random.default_rng(self.seed)
+        w, h = self.width, self.height
+        self.background = synthetic_background(w, h, self.seed, self.clutter).astype(np.float32)
+        self._levels = np.linspace(1 - self.drift, 1 + self.drift, 17) if self.drift else np.ones(1)
+        self._backgrounds = None      # background at every lighting level, built on first use
+        # noise bank around a +offset, the background levels are stored with -offset
+        self._offset = int(np.ceil(3 * self.noise))
+        self._noise = np.clip(rng.normal(self._offset, self.noise, (8, h, w, 3)), 0,
+                              2 * self._offset).astype(np.uint8) if self.noise else None
+        self._rng = rng
+        self._objects = [self._init(t, rng) for t in self.targets + self.decoys]
+        self._stamps = {}
+
+    def _init(self, t, rng):
+        w, h, r = self.width, self.height, t.radius
+        start = np.array(t.start if t.start is not None else
+                         (rng.uniform(r, w - r), rng.uniform(r, h - r)), float)
+        heading = t.heading if t.heading is not None else rng.uniform(0, 2 * np.pi)
+        return t, start, heading
+
+    def positions(self, frames):
+        """Target and decoy centers (len(frames), k, 2) for an array of frame indices."""
+        f = np.asarray(frames, float)[:, None]
+        w, h = self.width, self.height
+        out = []
+        for t, start, heading in self._objects:
+            r = t.radius
+            if t.path in ("bounce", "linear"):
+                p = start + t.speed * f * np.array([np.cos(heading), np.sin(heading)])
+                if t.path == "bounce":
+                    # triangle wave between r and size - r
+                    span = np.array([w - 2 * r, h - 2 * r], float)
+                    q = np.mod(p - r, 2 * span)
+                    p = r + span - np.abs(q - span)
+            else:
+                rx, ry = (w / 2 - r) * 0.8, (h / 2 - r) * 0.8
+                if t.path == "circle":
+                    rx = ry = min(rx, ry)
+                    length = 2 * np.pi * rx
+                else:                 # lissajous: x at 1x, y at 2x the base frequency
+                    length = 2 * np.pi * np.sqrt((rx * rx + 4 * ry * ry) / 2)
+                phase = heading + 2 * np.pi * t.speed * f[:, 0] / length
+                cy = 1 if t.path == "circle" else 2
+                p = np.stack([w / 2 + rx * np.cos(phase), h / 2 + ry * np.sin(cy * phase)], axis=1)
+            out.append(np.rint(p))
+        return np.stack(out, axis=1) if out else np.zeros((len(f), 0, 2))
+
+    def gains(self, frames):
+        if not self.drift:
+            return np.ones(len(frames))
+        return 1 + self.drift * np.sin(2 * np.pi * np.asarray(frames) / self.drift_period)
+
+    def _stamp(self, r):
+        if r not in self._stamps:
+            yy, xx = np.mgrid[-r:r + 1, -r:r + 1]
+            self._stamps[r] = (xx * xx + yy * yy <= r * r).astype(np.uint8)
+        return self._stamps[r]
+
+    def render(self, start, n, out=None):
+        """Frames start .. start + n - 1 as an (n, h, w, 3) uint8 batch, and their GroundTruth."""
+        w, h = self.width, self.height
+        if self._backgrounds is None:
+            self._backgrounds = np.stack([np.clip(self.background * g - self._offset, 0, 255).astype(np.uint8)
+                                          for g in self._levels])
+        if out is None:
+            out = np.empty((n, h, w, 3), np.uint8)
+        frames = np.arange(start, start + n)
+        gains = self.gains(frames)
+        level = np.abs(gains[:, None] - self._levels[None]).argmin(axis=1)
+        if self._noise is not None:
+            # bank fields in a random rotation, each frame gets a different one
+            bank = len(self._noise)
+            k = int(self._rng.integers(0, bank))
+            for i in range(n):
+                cv2.add(self._backgrounds[level[i]], self._noise[(k + i) % bank], dst=out[i])
+        else:
+            for i in range(n):
+                out[i] = self._backgrounds[level[i]]
+
+        centers = self.positions(frames)
+        radii = np.array([t.radius for t, _, _ in self._objects])
+        for i in range(n):
+            for j, (t, _, _) in enumerate(self._objects):
+                cx, cy = int(centers[i, j, 0]), int(centers[i, j, 1])
+                r = t.radius
+                x0, y0, x1, y1 = max(cx - r, 0), max(cy - r, 0), min(cx + r + 1, w), min(cy + r + 1, h)
+                if x0 >= x1 or y0 >= y1:
+                    continue
+                disc = self._stamp(r)[y0 - cy + r:y1 - cy + r, x0 - cx + r:x1 - cx + r]
+                color = np.array(t.color) * gains[i]
+                if self._noise is not None:
+                    # the target gets the same noise field as the background under it
+                    stamp = cv2.add(self._noise[(k + i) % bank, y0:y1, x0:x1], (*(color - self._offset), 0))
+                else:
+                    stamp = np.full((y1 - y0, x1 - x0, 3), np.clip(color, 0, 255), np.uint8)
+                cv2.copyTo(stamp, disc, out[i, y0:y1, x0:x1])
+
+        # ground truth for the targets only (decoys come after them)
+        c = centers[:, :len(self.targets)]
+        r = radii[None, :len(self.targets)]
+        x0 = np.clip(c[..., 0] - r, 0, w); x1 = np.clip(c[..., 0] + r + 1, 0, w)
+        y0 = np.clip(c[..., 1] - r, 0, h); y1 = np.clip(c[..., 1] + r + 1, 0, h)
+        bbox = np.stack([x0, y0, x1 - x0, y1 - y0], axis=-1).astype(int)
+        visible = (c[..., 0] >= 0) & (c[..., 0] < w) & (c[..., 1] >= 0) & (c[..., 1] < h)
+        return out, GroundTruth(frames, c, bbox, visible)
+
+    def batches(self, batch=32, frames=None):
+        """Yield (frames, GroundTruth) batches, forever or until `frames` frames."""
+        start = 0
+        while frames is None or start < frames:
+            n = batch if frames is None else min(batch, frames - start)
+            yield self.render(start, n)
+            start += n
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--targets", type=int, default=1)
+    ap.add_argument("--decoys", type=int, default=0)
+    ap.add_argument("--path", default="bounce")
+    ap.add_argument("--batch", type=int, default=32)
+    ap.add_argument("--frames", type=int, default=512)
+    ap.add_argument("--show", action="store_true", help="play the scene with its ground truth")
+    args = ap.parse_args()
+
+    def scene(w, h):
+        return Scene(w, h, [Target(path=args.path) for _ in range(args.targets)],
+                     [Target(path="bounce", color=DECOY_BGR[i % 2]) for i in range(args.decoys)])
+
+    if args.show:
+        for frames, truth in scene(640, 480).batches(args.batch, args.frames):
+            for frame, boxes, visible in zip(frames, truth.bbox, truth.visible):
+                for (x, y, bw, bh), v in zip(boxes, visible):
+                    if v:
+                        cv2.rectangle(frame, (x, y), (x + bw, y + bh), (0, 255, 0), 1)
+                cv2.imshow("scene", frame)
+                if cv2.waitKey(15) & 0xFF == ord('q'):
+                    return
+        return
+
+    print(f"{args.targets} targets, {args.decoys} decoys, batches of {args.batch}")
+    for w, h in ((640, 480), (1280, 720), (1920, 1080)):
+        s = scene(w, h)
+        s.render(0, 1)                            # lighting levels outside the timing
+        out = np.empty((args.batch, h, w, 3), np.uint8)
+        t0 = time.perf_counter()
+        for start in range(0, args.frames, args.batch):
+            s.render(start, args.batch, out)
+        fps = args.frames / (time.perf_counter() - t0)
+        print(f"{w:>5d}x{h:<4d} {fps:8.0f} fps")
+
+
+if __name__ == "__main__":
+    main()
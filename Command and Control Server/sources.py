@@ -0,0 +1,250 @@
+"""
+sources.py
+Interchangeable video sources: camera, video file, image directory, synthetic scene.
+
+Every source reads like cv2.VideoCapture (read() -> (ok, frame), release()),
+so the trackers don't care where frames come from. open_source() builds
+one from a URI:
+
+    0, cam:0, /dev/video0          live camera (CaptureProfile applied)
+    clip.mp4, file:clip.mp4        video file
+    frames/, dir:frames/           image files in name order
+    synth:, synth:1280x720@60      synthetic scene with ground truth (scenes.py)
+
+    ?fast                          no pacing, frames as fast as they can be read
+    ?loop                          files, directories and synth start over at the end
+    ?frames=N                      synthetic scene length (default 300)
+    ?targets=N&decoys=N&path=P     synthetic targets, near-red decoys, trajectory
+    ?speed=V                       synthetic target speed in px/frame (default 4)
+    ?noise=S&seed=N                synthetic sensor noise std and random seed
+    ?fps=N                         pacing rate for directories (default 30)
+
+    e.g.  python newguibrain.py synth:1280x720@30?loop
+          python redTracker.py clip.mp4?fast
+
+Real-time mode (the default) delivers frames at the source's frame rate,
+like a camera would, so latency figures stay comparable; fast mode measures
+throughput. A camera is always real time.
+"""
+
+import os
+import time
+from urllib.parse import parse_qs
+
+import cv2
+
+from scenes import DECOY_BGR, GroundTruth, Scene, Target
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+
+class VideoSource:
+    """Base class: paces read() to `fps` in real-time mode."""
+
+    def __init__(self, fps=30.0, realtime=True, loop=False):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.width = None
+        self.height = None
+        self.negotiated = {}          # camera only: prop -> (requested, actual)
+        self.finished = False         # no more frames will come
+        self.frames = 0
+        self._t_next = None
+
+    def open(self):
+        return self
+
+    def isOpened(self):
+        return not self.finished
+
+    def grab(self):
+        """Next frame without pacing, None at the end."""
+        raise NotImplementedError
+
+    def read(self):
+        frame = self.grab()
+        if frame is None and self.loop and self.frames:
+            self.rewind()
+            frame = self.grab()
+        if frame is None:
+            self.finished = True
+            return False, None
+        if self.realtime and self.fps:
+            now = time.perf_counter()
+            if self._t_next is None or now - self._t_next > 1.0:
+                self._t_next = now            # first frame, or resync after a stall
+            time.sleep(max(0.0, self._t_next - now))
+            self._t_next += 1 / self.fps
+        self.frames += 1
+        return True, frame
+
+    def rewind(self):
+        pass
+
+    def frame_age(self):
+        """Seconds since the frame just read was captured, None if unknown."""
+        return None
+
+    def release(self):
+        self.finished = True
+
+
+class CameraSource(VideoSource):
+    def __init__(self, device=0, profile=None):
+        from capture import CaptureProfile
+        super().__init__(fps=None, realtime=False)   # the camera paces itself
+        self.device = device
+        self.profile = profile or CaptureProfile()
+        self.cap = None
+
+    def open(self):
+        from capture import read_back
+        self.cap = cv2.VideoCapture(self.device)
+        self.negotiated = self.profile.apply(self.cap)
+        self.width = self.negotiated["width"][1] or self.profile.width
+        self.height = self.negotiated["height"][1] or self.profile.height
+        self.fps = read_back(self.cap, "fps")
+        return self
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self):
+        # a failed read is usually transient (USB hiccup), so it doesn't end the stream
+        ok, frame = self.cap.read()
+        if ok:
+            self.frames += 1
+        return ok, frame
+
+    def frame_age(self):
+        from capture import frame_age
+        return frame_age(self.cap)
+
+    def release(self):
+        super().release()
+        if self.cap is not None:
+            self.cap.release()
+
+
+class FileSource(VideoSource):
+    def __init__(self, path, realtime=True, loop=False):
+        super().__init__(realtime=realtime, loop=loop)
+        self.path = path
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            raise IOError(f"cannot open video file {self.path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return self
+
+    def grab(self):
+        ok, frame = self.cap.read()
+        return frame if ok else None
+
+    def rewind(self):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        super().release()
+        if self.cap is not None:
+            self.cap.release()
+
+
+class ImageDirSource(VideoSource):
+    def __init__(self, path, fps=30.0, realtime=True, loop=False):
+        super().__init__(fps, realtime, loop)
+        self.path = path
+        self.files = []
+        self.index = 0
+
+    def open(self):
+        self.files = sorted(os.path.join(self.path, f) for f in os.listdir(self.path)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.files:
+            raise IOError(f"no images in {self.path}")
+        first = cv2.imread(self.files[0])
+        self.height, self.width = first.shape[:2]
+        return self
+
+    def grab(self):
+        while self.index < len(self.files):
+            frame = cv2.imread(self.files[self.index])
+            self.index += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def rewind(self):
+        self.index = 0
+
+
+class SyntheticSource(VideoSource):
+    """Frames of a scenes.Scene; `truth` is the GroundTruth of the last frame read."""
+
+    def __init__(self, scene=None, fps=30.0, frames=300, realtime=True, loop=False, batch=16):
+        super().__init__(fps, realtime, loop)
+        self.scene = scene or Scene(targets=[Target(path="lissajous")])
+        self.width, self.height = self.scene.width, self.scene.height
+        self.length = frames
+        self.batch = batch
+        self.index = 0
+        self.truth = None
+        self._frames, self._truth = None, None
+
+    def grab(self):
+        if self.index >= self.length:
+            return None
+        i = self.index % self.batch
+        if i == 0:
+            n = min(self.batch, self.length - self.index)
+            self._frames, self._truth = self.scene.render(self.index, n)
+        self.truth = GroundTruth(*(a[i] for a in self._truth))
+        self.index += 1
+        return self._frames[i]
+
+    def rewind(self):
+        self.index = 0
+
+
+def open_source(uri, realtime=True, profile=None):
+    """Open a VideoSource from a URI (see the module docstring); ints are camera indices."""
+    if isinstance(uri, VideoSource):
+        return uri.open()
+    if isinstance(uri, int):
+        return CameraSource(uri, profile).open()
+    uri, _, query = str(uri).partition("?")
+    opts = {k: v[-1] for k, v in parse_qs(query, keep_blank_values=True).items()}
+    realtime = realtime and "fast" not in opts
+    loop = "loop" in opts
+    scheme, sep, rest = uri.partition(":")
+    if not sep or len(scheme) == 1:           # no scheme (or a Windows drive letter)
+        scheme, rest = "", uri
+
+    if scheme == "cam" or (not scheme and (rest.isdigit() or rest.startswith("/dev/video"))):
+        return CameraSource(int(rest) if rest.isdigit() else rest, profile).open()
+    if scheme == "synth":
+        size, _, fps = (rest or "640x480").partition("@")
+        w, h = (int(v) for v in size.split("x"))
+        radius, path, speed = max(12, w // 30), opts.get("path", "lissajous"), float(opts.get("speed", 4))
+        scene = Scene(w, h, [Target(radius, speed, path) for _ in range(int(opts.get("targets", 1)))],
+                      [Target(radius, color=DECOY_BGR[i % 2]) for i in range(int(opts.get("decoys", 0)))],
+                      noise=float(opts.get("noise", 6)), seed=int(opts.get("seed", 0)))
+        return SyntheticSource(scene, float(fps or 30), int(opts.get("frames", 300)), realtime, loop).open()
+    if scheme == "dir" or (not scheme and os.path.isdir(rest)):
+        return ImageDirSource(rest, float(opts.get("fps", 30)), realtime, loop).open()
+    if scheme in ("file", ""):
+        return FileSource(rest, realtime, loop).open()
+    raise ValueError(f"unknown video source {uri!r}")
+
+
+def add_source_argument(parser, default="0"):
+    """Add the positional `source` URI and --fast to an argparse parser."""
+    parser.add_argument("source", nargs="?", default=default,
+                        help="camera index, video file, image directory or synth:WxH@FPS "
+                             "(see sources.py)")
+    parser.add_argument("--fast", action="store_true", help="don't pace file/synthetic sources")
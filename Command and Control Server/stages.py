@@ -0,0 +1,227 @@
+"""
+stages.py
+Pipelined stage executor for one camera stream.
+
+The detection chain is split into stages that run on their own threads,
+connected by bounded queues, so frame N can be in the contour stage while
+frame N+1 is in the color stage. OpenCV releases the GIL inside its calls, so
+stage threads run on separate cores. A stage can have several workers when
+it is the bottleneck. Results are put back in frame order before they leave
+the pipeline.
+
+    submit(frame) --> [color] --q--> [morph] --q--> [blobs] --q--> reorder --> get()
+
+Bounded queues give back-pressure: submit() blocks once `depth` frames are
+waiting in front of a stage, so a slow stage cannot build an unbounded
+backlog (and unbounded latency).
+
+Every stage function takes and returns a dict. RED_STAGES splits the
+detection.detect_red chain; run this file to compare configurations:
+
+    python stages.py --frames 300 --size 1280x720
+    python stages.py --fps 30             # paced like a camera, latency without backlog
+"""
+
+import argparse
+import heapq
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from detection import KERNEL, RED_LUT, Detection, largest_blob
+
+_STOP = object()
+
+
+class _Failed:
+    """Stands in for an item whose stage raised; later stages pass it through."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+class StagedExecutor:
+    def __init__(self, stages, depth=2):
+        # stages: [(name, fn)] or [(name, fn, workers)]
+        self.stages = [(s[0], s[1], s[2] if len(s) > 2 else 1) for s in stages]
+        self.depth = depth
+        self.queues = [queue.Queue(depth) for _ in range(len(self.stages) + 1)]
+        self.threads = []
+        self.busy = {name: 0.0 for name, _, _ in self.stages}   # s spent per stage
+        self._lock = threading.Lock()
+        self._next_in = 0
+        self._next_out = 0
+        self._pending = []            # heap of finished (seq, item) waiting for earlier frames
+        self._stopped = [0] * len(self.stages)   # workers that saw the end, per stage
+
+    def start(self):
+        for k, (name, fn, workers) in enumerate(self.stages):
+            for _ in range(workers):
+                t = threading.Thread(target=self._run, args=(k, name, fn, workers), daemon=True)
+                t.start()
+                self.threads.append(t)
+        return self
+
+    def _run(self, k, name, fn, workers):
+        src, dst = self.queues[k], self.queues[k + 1]
+        while True:
+            job = src.get()
+            if job is _STOP:
+                src.put(_STOP)        # let this stage's other workers see it too
+                break
+            seq, item = job
+            if not isinstance(item, _Failed):
+                t0 = time.perf_counter()
+                try:
+                    item = fn(item)
+                except Exception as e:    # raised by get() for this frame, in stream order
+                    item = _Failed(e)
+                dt = time.perf_counter() - t0
+                with self._lock:
+                    self.busy[name] += dt
+            dst.put((seq, item))
+        # the last worker of a stage to stop passes the end of the stream on
+        with self._lock:
+            self._stopped[k] += 1
+            last = self._stopped[k] == workers
+        if last:
+            dst.put(_STOP)
+
+    def submit(self, item):
+        """Queue one frame's item (a dict); blocks while the first stage is full."""
+        item.setdefault("t_submit", time.perf_counter())
+        self.queues[0].put((self._next_in, item))
+        self._next_in += 1
+
+    def get(self, timeout=None):
+        """Next finished item in submission order; None at the end of the stream.
+
+        If a stage raised for this item, the exception is raised here instead;
+        the next get() continues with the following item.
+        """
+        while not self._pending or self._pending[0][0] != self._next_out:
+            job = self.queues[-1].get(timeout=timeout)
+            if job is _STOP:
+                return None
+            heapq.heappush(self._pending, job)
+        _, item = heapq.heappop(self._pending)
+        self._next_out += 1
+        if isinstance(item, _Failed):
+            raise item.error
+        item["t_done"] = time.perf_counter()
+        return item
+
+    def close(self):
+        self.queues[0].put(_STOP)
+
+    def join(self):
+        for t in self.threads:
+            t.join()
+
+
+# ---------------- red detection split into stages -----------------
+def color_stage(item):
+    blur = cv2.GaussianBlur(item["frame"], (7, 7), 0)
+    item["mask"] = RED_LUT.mask(blur)
+    return item
+
+
+def morph_stage(item):
+    mask = cv2.morphologyEx(item["mask"], cv2.MORPH_CLOSE, KERNEL)
+    item["mask"] = cv2.morphologyEx(mask, cv2.MORPH_OPEN, KERNEL)
+    return item
+
+
+def blob_stage(item):
+    item["det"] = largest_blob(item["mask"], Detection(item["frame_id"], item["t_submit"]))
+    return item
+
+
+def draw_stage(item):
+    det, frame = item["det"], item["frame"]
+    if det.found:
+        x, y, w, h = det.bbox
+        cv2.drawContours(frame, [det.contour], -1, (0, 255, 0), 1)
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
+        cv2.circle(frame, (det.cx, det.cy), 6, (0, 0, 255), -1)
+    return item
+
+
+def sequential_stage(item):
+    return draw_stage(blob_stage(morph_stage(color_stage(item))))
+
+
+RED_STAGES = [("color", color_stage), ("morph", morph_stage),
+              ("blobs", blob_stage), ("draw", draw_stage)]
+
+CONFIGS = {
+    "sequential": [("all", sequential_stage)],
+    "2 stages": [("color", color_stage),
+                 ("rest", lambda item: draw_stage(blob_stage(morph_stage(item))))],
+    "4 stages": RED_STAGES,
+    "4 stages, color x2": [("color", color_stage, 2)] + RED_STAGES[1:],
+}
+
+
+def run_config(stages, frames, depth=2, fps=0.0):
+    """Push `frames` through a pipeline, paced at `fps` (0 = as fast as it takes them)."""
+    ex = StagedExecutor(stages, depth).start()
+    latencies = []
+
+    def feed():
+        t_next = time.perf_counter()
+        for i, f in enumerate(frames):
+            if fps:
+                time.sleep(max(0.0, t_next - time.perf_counter()))
+                t_next += 1 / fps
+            ex.submit({"frame_id": i, "frame": f.copy()})
+        ex.close()
+
+    t0 = time.perf_counter()
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    order = []
+    while (item := ex.get()) is not None:
+        latencies.append(item["t_done"] - item["t_submit"])
+        order.append(item["frame_id"])
+    elapsed = time.perf_counter() - t0
+    ex.join()
+    assert order == list(range(len(frames))), "frames left out of order"
+    return len(frames) / elapsed, np.percentile(latencies, 50) * 1000, \
+        np.percentile(latencies, 99) * 1000, ex.busy
+
+
+def main():
+    from bench_pyramid import synthetic_frames
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--size", default="1280x720")
+    ap.add_argument("--depth", type=int, default=2, help="queue size between stages")
+    ap.add_argument("--fps", type=float, default=0.0,
+                    help="camera rate to feed at; 0 floods the pipeline (latency then includes queueing)")
+    args = ap.parse_args()
+    w, h = (int(v) for v in args.size.split("x"))
+    frames = synthetic_frames(args.frames, w, h)
+    RED_LUT.mask(frames[0])                       # warm up outside the timings
+
+    # per-frame cost of the plain chain, the floor for any pipeline's latency
+    t0 = time.perf_counter()
+    for i, f in enumerate(frames[:50]):
+        sequential_stage({"frame_id": i, "frame": f.copy(), "t_submit": 0.0})
+    base = (time.perf_counter() - t0) * 1000 / 50
+
+    print(f"{w}x{h}, {args.frames} frames, queue depth {args.depth}, "
+          f"fed at {f'{args.fps:g} fps' if args.fps else 'full speed'}, "
+          f"plain loop {base:.2f} ms/frame ({1000 / base:.0f} fps)")
+    print(f"{'config':>20s} {'fps':>7s} {'p50 ms':>7s} {'p99 ms':>7s} {'added p50':>9s}  busy ms/frame per stage")
+    for name, stages in CONFIGS.items():
+        fps, p50, p99, busy = run_config(stages, frames, args.depth, args.fps)
+        per = ", ".join(f"{k}={v * 1000 / len(frames):.2f}" for k, v in busy.items())
+        print(f"{name:>20s} {fps:7.1f} {p50:7.2f} {p99:7.2f} {p50 - base:+9.2f}  {per}")
+
+
+if __name__ == "__main__":
+    main()
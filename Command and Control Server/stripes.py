@@ -0,0 +1,219 @@
+"""
+stripes.py
+Stripe-parallel red mask and blob extraction.
+
+The frame is split into horizontal stripes that are processed on a
+ThreadPoolExecutor; OpenCV releases the GIL, so the stripes run on separate
+cores.
+
+    StripeMasker  blur -> HSV -> close -> open per stripe. Each stripe is
+                  computed with `halo` extra rows above and below (the reach
+                  of the blur plus both morphology passes), and only its own
+                  rows are kept, so the mask is identical to FramePipeline's.
+    StripeBlobs   connectedComponentsWithStats per stripe. Labels that touch
+                  across a seam (8-connectivity) are merged, so area, bbox and
+                  centroid of every blob are identical to blobs.component_blob
+                  and blobs.blob_arrays on the whole mask.
+
+Inputs with fewer than `min_rows` rows per stripe (ROI crops, shrunk frames)
+take the serial path. Run this file to compare against the serial path:
+
+    python stripes.py
+    python stripes.py --stripes 2 4 8 --frames 60
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from blobs import blob_arrays, component_blob
+from detection import KERNEL, MIN_AREA, RED_LUT
+from pipeline import FramePipeline
+
+BLUR_RADIUS = 3                       # detection blurs with a 7x7 Gaussian
+
+
+def halo_rows(kernel=KERNEL):
+    """Rows a stripe needs beyond its own for an exact mask."""
+    # close and open are two passes each (dilate + erode)
+    return BLUR_RADIUS + 4 * (kernel.shape[0] // 2)
+
+
+def stripe_bounds(h, stripes):
+    # even edges: OpenCV labels in 2x2 blocks, so each stripe keeps the global label order
+    edges = np.linspace(0, h, stripes + 1).astype(int) // 2 * 2
+    edges[-1] = h
+    return list(zip(edges[:-1], edges[1:]))
+
+
+class StripeMasker:
+    """Drop-in for FramePipeline as RoiTracker's mask_fn."""
+
+    def __init__(self, stripes=4, lut=RED_LUT, kernel=KERNEL, pool=None, min_rows=64):
+        self.stripes = stripes
+        self.halo = halo_rows(kernel)
+        self.min_rows = min_rows
+        self.pool = pool or ThreadPoolExecutor(stripes, thread_name_prefix="stripe")
+        # one pipeline per stripe, so each keeps its own buffers
+        self.pipes = [FramePipeline(lut, kernel) for _ in range(stripes)]
+        self.serial = self.pipes[0]
+        self.shrink = self.serial.shrink
+
+    def mask(self, frame):
+        h, w = frame.shape[:2]
+        if h < self.stripes * self.min_rows:
+            return self.serial.mask(frame)    # small input
+        out = self.serial.buffer("stripes", (h, w))
+
+        def run(k, r0, r1):
+            a, b = max(0, r0 - self.halo), min(h, r1 + self.halo)
+            mask = self.pipes[k].mask(frame[a:b])
+            out[r0:r1] = mask[r0 - a:r1 - a]
+
+        jobs = [self.pool.submit(run, k, r0, r1)
+                for k, (r0, r1) in enumerate(stripe_bounds(h, self.stripes))]
+        for job in jobs:
+            job.result()
+        return out
+
+    __call__ = mask
+
+
+class StripeBlobs:
+    """Stripe-parallel connected components; a blob backend like blobs.component_blob."""
+
+    def __init__(self, stripes=4, pool=None, min_rows=64):
+        self.stripes = stripes
+        self.min_rows = min_rows
+        self.pool = pool or ThreadPoolExecutor(stripes, thread_name_prefix="stripe")
+        self.seam_merges = 0          # blobs joined across a seam so far
+
+    def components(self, mask):
+        """Stats of every blob as (areas, bboxes (x, y, w, h), centroids), in label order."""
+        h = mask.shape[0]
+        bounds = stripe_bounds(h, self.stripes)
+
+        def label(r0, r1):
+            _, labels, stats, centroids = cv2.connectedComponentsWithStats(mask[r0:r1], connectivity=8)
+            return labels, stats[1:], centroids[1:]
+
+        parts = list(self.pool.map(lambda b: label(*b), bounds))
+        offsets = np.cumsum([0] + [len(p[1]) for p in parts])
+        n = int(offsets[-1])
+        stats = np.concatenate([p[1] for p in parts]).astype(np.int64)
+        centroids = np.concatenate([p[2] for p in parts])
+        areas = stats[:, cv2.CC_STAT_AREA]
+        # pixel coordinate sums are integers, so the merged centroids stay exact
+        rows = np.repeat([r0 for r0, _ in bounds], [len(p[1]) for p in parts])
+        stats[:, cv2.CC_STAT_TOP] += rows
+        sx = np.rint(centroids[:, 0] * areas)
+        sy = np.rint(centroids[:, 1] * areas) + rows * areas
+
+        # union labels that touch across each seam; the root is the smallest id,
+        # so merged blobs keep the order connectedComponents gives the whole mask
+        parent = np.arange(n)
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for k in range(len(parts) - 1):
+            above, below = parts[k][0][-1], parts[k + 1][0][0]
+            pairs = set()
+            for dx in (-1, 0, 1):
+                a = above[max(0, -dx):len(above) - max(0, dx)]
+                b = below[max(0, dx):len(below) - max(0, -dx)]
+                hit = (a > 0) & (b > 0)
+                pairs.update(zip((a[hit] - 1 + offsets[k]).tolist(),
+                                 (b[hit] - 1 + offsets[k + 1]).tolist()))
+            for i, j in pairs:
+                ri, rj = find(i), find(j)
+                if ri != rj:
+                    parent[max(ri, rj)] = min(ri, rj)
+                    self.seam_merges += 1
+        roots = np.array([find(i) for i in range(n)], dtype=np.intp)
+        keep, index = np.unique(roots, return_inverse=True)
+
+        m = len(keep)
+        area = np.bincount(index, areas, m)
+        x0 = np.full(m, np.iinfo(np.int64).max); y0 = x0.copy()
+        x1 = np.zeros(m, np.int64); y1 = x1.copy()
+        np.minimum.at(x0, index, stats[:, cv2.CC_STAT_LEFT])
+        np.minimum.at(y0, index, stats[:, cv2.CC_STAT_TOP])
+        np.maximum.at(x1, index, stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH])
+        np.maximum.at(y1, index, stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT])
+        cent = np.stack([np.bincount(index, sx, m), np.bincount(index, sy, m)], axis=1) / area[:, None]
+        return area.astype(np.int64), np.stack([x0, y0, x1 - x0, y1 - y0], axis=1), cent
+
+    def arrays(self, mask, min_area=MIN_AREA):
+        """Same as blobs.blob_arrays: centroids (N, 2), bboxes (N, 4), areas (N,)."""
+        if mask.shape[0] < self.stripes * self.min_rows:
+            return blob_arrays(mask, min_area)
+        areas, bboxes, centroids = self.components(mask)
+        keep = np.flatnonzero(areas > min_area)
+        return centroids[keep], bboxes[keep], areas[keep].astype(float)
+
+    def blob(self, mask, det, min_area=MIN_AREA):
+        if mask.shape[0] < self.stripes * self.min_rows:
+            return component_blob(mask, det, min_area)
+        areas, bboxes, centroids = self.components(mask)
+        if not len(areas):
+            return det
+        i = int(np.argmax(areas))
+        if areas[i] <= min_area:
+            return det
+        det.cx, det.cy = int(centroids[i, 0]), int(centroids[i, 1])
+        det.bbox = tuple(int(v) for v in bboxes[i])
+        det.area = float(areas[i])
+        return det
+
+    __call__ = blob
+
+
+def main():
+    from bench_pyramid import synthetic_frames
+    from detection import Detection
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=30)
+    ap.add_argument("--stripes", type=int, nargs="+", default=[2, 4])
+    args = ap.parse_args()
+    print(f"{os.cpu_count()} cores, {args.frames} frames; ms/frame for mask + blobs")
+    print(f"{'resolution':>10s} {'serial':>8s}" + "".join(f"{f'{s} stripes':>11s}" for s in args.stripes)
+          + "  identical")
+    for w, h in ((640, 480), (1280, 720), (1920, 1080)):
+        frames = synthetic_frames(args.frames, w, h)
+        serial_mask = FramePipeline()
+        serial_mask(frames[0])                    # buffers outside the timings
+        t0 = time.perf_counter()
+        for i, f in enumerate(frames):
+            component_blob(serial_mask(f), Detection(i, 0.0))
+        row = f"{w:>5d}x{h:<4d} {(time.perf_counter() - t0) * 1000 / len(frames):8.2f}"
+
+        identical = True
+        for s in args.stripes:
+            pool = ThreadPoolExecutor(s, thread_name_prefix="stripe")
+            masker, blobs = StripeMasker(s, pool=pool), StripeBlobs(s, pool=pool)
+            masker(frames[0])
+            t0 = time.perf_counter()
+            for i, f in enumerate(frames):
+                blobs(masker(f), Detection(i, 0.0))
+            row += f"{(time.perf_counter() - t0) * 1000 / len(frames):11.2f}"
+            for i, f in enumerate(frames):
+                mask, ref = masker(f), serial_mask(f)
+                det, ref_det = blobs(mask, Detection(i, 0.0)), component_blob(ref, Detection(i, 0.0))
+                identical &= np.array_equal(mask, ref)
+                identical &= (det.cx, det.cy, det.bbox, det.area) == \
+                    (ref_det.cx, ref_det.cy, ref_det.bbox, ref_det.area)
+                identical &= all(np.array_equal(a, b) for a, b in zip(blobs.arrays(mask), blob_arrays(ref)))
+            pool.shutdown()
+        print(row + f"  {'yes' if identical else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
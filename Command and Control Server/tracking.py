@@ -0,0 +1,116 @@
+"""
+tracking.py
+ROI-restricted tracking around the last known target position.
+
+Once a target has been found, only a window around its predicted position is
+thresholded and morphed. The window grows with every miss and after
+`max_misses` consecutive misses the tracker falls back to a full-frame search.
+"""
+
+import time
+
+from detection import Detection, MIN_AREA, largest_blob, offset_detection, pyramid_blob
+from pipeline import FramePipeline
+
+
+class RoiTracker:
+    def __init__(self, mask_fn=None, min_area=MIN_AREA,
+                 margin=1.5, min_half=32, grow=1.5, max_misses=5, pyramid=1,
+                 blob_fn=largest_blob):
+        # default: the red pipeline that reuses its buffers between frames
+        self.mask_fn = mask_fn or FramePipeline()
+        self.shrink_fn = getattr(self.mask_fn, "shrink", None)
+        self.min_area = min_area
+        self.blob_fn = blob_fn        # blob backend, see blobs.py
+        self.margin = margin          # window size relative to the target bbox
+        self.min_half = min_half      # px, smallest half-size of the window
+        self.grow = grow              # window growth factor per miss
+        self.max_misses = max_misses  # misses before a full-frame search
+        self.pyramid = pyramid        # >1: full-frame searches run coarse-to-fine
+
+        self.last = None              # last Detection that found the target
+        self.vx, self.vy = 0.0, 0.0   # px/frame, from the last two hits
+        self.misses = 0
+
+        # counters
+        self.frames = 0
+        self.roi_frames = 0
+        self.pixels = 0               # pixels actually processed
+        self.full_pixels = 0          # pixels a full-frame search would process
+
+    def reset(self):
+        """Forget the target; the next update searches the full frame."""
+        self.last = None
+        self.vx, self.vy = 0.0, 0.0
+        self.misses = 0
+
+    @property
+    def locked(self):
+        return self.last is not None and self.misses < self.max_misses
+
+    def window(self, w, h):
+        """Search window (x0, y0, x1, y1) for the next frame, None for full frame."""
+        if not self.locked:
+            return None
+        _, _, bw, bh = self.last.bbox
+        steps = self.misses + 1       # frames since the last hit
+        px = self.last.cx + self.vx * steps
+        py = self.last.cy + self.vy * steps
+        # room for the target itself plus the distance it may have moved
+        motion = (abs(self.vx) + abs(self.vy)) * steps
+        half = max(self.min_half, self.margin * max(bw, bh) / 2 + motion)
+        half *= self.grow ** self.misses
+        x0, y0 = max(0, int(px - half)), max(0, int(py - half))
+        x1, y1 = min(w, int(px + half)), min(h, int(py + half))
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            return None               # prediction left the frame
+        return x0, y0, x1, y1
+
+    def update(self, frame, frame_id=0, t_capture=None):
+        if t_capture is None:
+            t_capture = time.perf_counter()
+        h, w = frame.shape[:2]
+        det = Detection(frame_id, t_capture)
+        roi = self.window(w, h)
+
+        if roi is None and self.pyramid > 1:
+            pyramid_blob(frame, det, self.mask_fn, self.min_area, self.pyramid,
+                         shrink_fn=self.shrink_fn, blob_fn=self.blob_fn)
+            self.pixels += w * h // (self.pyramid * self.pyramid)
+        elif roi is None:
+            self.blob_fn(self.mask_fn(frame), det, self.min_area)
+            self.pixels += w * h
+        else:
+            x0, y0, x1, y1 = roi
+            self.blob_fn(self.mask_fn(frame[y0:y1, x0:x1]), det, self.min_area)
+            offset_detection(det, x0, y0)
+            det.roi = roi
+            self.roi_frames += 1
+            self.pixels += (x1 - x0) * (y1 - y0)
+        self.frames += 1
+        self.full_pixels += w * h
+
+        self.observe(det)
+        det.t_done = time.perf_counter()
+        return det
+
+    def observe(self, det):
+        """Update the lock from a detection, including ones found by other trackers."""
+        if det.found:
+            if self.last is not None and self.misses < self.max_misses:
+                steps = self.misses + 1
+                self.vx = (det.cx - self.last.cx) / steps
+                self.vy = (det.cy - self.last.cy) / steps
+            else:
+                self.vx, self.vy = 0.0, 0.0
+            self.last = det
+            self.misses = 0
+        else:
+            self.misses += 1
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "roi_frames": self.roi_frames,
+            "pixel_ratio": self.pixels / self.full_pixels if self.full_pixels else 1.0,
+        }
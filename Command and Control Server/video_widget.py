@@ -0,0 +1,168 @@
+"""
+video_widget.py
+Video display widget that paints BGR frames without converting or copying them.
+
+set_frame() keeps a reference to the numpy frame and wraps its memory in a
+QImage (Format_BGR888), so there is no cvtColor, no RGB copy and no
+QPixmap upload: paintEvent draws the QImage straight onto the widget. The
+array reference is held for as long as the QImage points into it, so the
+buffer cannot be freed under Qt. The producer must not write into a frame
+after handing it over (FrameGrabber delivers a fresh array per read).
+
+When the same buffer comes back (a producer that reuses its frames) the
+QImage wrapper is reused too. While the widget is hidden, frames are only
+stored; nothing is wrapped or repainted until it is shown again.
+
+The frame is scaled to fit the widget with its aspect ratio kept;
+frame_pos() maps widget coordinates (mouse clicks) back to frame pixels.
+An Overlay (overlay.py) passed with the frame is painted on top in frame
+coordinates; the frame itself is never drawn into.
+
+    python video_widget.py        # per-frame display cost, QLabel path vs this widget
+"""
+
+import numpy as np
+from PyQt5.QtCore import QPoint, QRect, Qt
+from PyQt5.QtGui import QColor, QFont, QImage, QPainter, QPen, QPolygon
+from PyQt5.QtWidgets import QWidget
+
+from overlay import Circle, Contour, Rect, Text
+
+HERSHEY_PX = 30                       # Qt pixel size matching cv2 font scale 1.0
+
+
+def qcolor(bgr):
+    return QColor(bgr[2], bgr[1], bgr[0])
+
+
+class VideoWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)   # every pixel is painted, skip the background fill
+        self._frame = None            # the array the QImage points into
+        self._overlay = None
+        self._image = None
+        self._key = None              # (data pointer, shape) the QImage was built for
+        self.frames = 0
+        self.repaints = 0
+
+    def set_frame(self, frame, overlay=None):
+        """Show a BGR uint8 frame (h, w, 3); the widget keeps a reference, not a copy."""
+        if not frame.flags.c_contiguous:
+            frame = np.ascontiguousarray(frame)
+        self._frame = frame
+        self._overlay = overlay
+        self.frames += 1
+        if self.isVisible():
+            self.update()
+
+    def _wrap(self):
+        frame = self._frame
+        key = (frame.ctypes.data, frame.shape)
+        if key != self._key:
+            h, w = frame.shape[:2]
+            self._image = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+            self._key = key
+        return self._image
+
+    def target_rect(self):
+        """Where the frame is drawn inside the widget."""
+        h, w = self._frame.shape[:2]
+        s = min(self.width() / w, self.height() / h)
+        tw, th = int(w * s), int(h * s)
+        return QRect((self.width() - tw) // 2, (self.height() - th) // 2, tw, th)
+
+    def frame_pos(self, x, y):
+        """Frame pixel under widget position (x, y), None outside the frame."""
+        if self._frame is None:
+            return None
+        r = self.target_rect()
+        if not r.contains(x, y):
+            return None
+        h, w = self._frame.shape[:2]
+        return (int((x - r.x()) * w / r.width()), int((y - r.y()) * h / r.height()))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self._frame is None:
+            painter.fillRect(self.rect(), Qt.black)
+            return
+        r = self.target_rect()
+        if r != self.rect():
+            painter.fillRect(self.rect(), Qt.black)
+        painter.drawImage(r, self._wrap())
+        if self._overlay is not None:
+            h, w = self._frame.shape[:2]
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.translate(r.x(), r.y())
+            painter.scale(r.width() / w, r.height() / h)
+            self.paint_overlay(painter, self._overlay)
+        self.repaints += 1
+
+    @staticmethod
+    def paint_overlay(painter, overlay):
+        """Paint `overlay` with `painter` already mapped to frame coordinates."""
+        for s in overlay.shapes:
+            color = qcolor(s.color)
+            painter.setPen(QPen(color, max(1, s.thickness)))
+            painter.setBrush(Qt.NoBrush)
+            if isinstance(s, Circle):
+                if s.thickness < 0:
+                    painter.setPen(Qt.NoPen)
+                    painter.setBrush(color)
+                painter.drawEllipse(QPoint(*s.center), s.radius, s.radius)
+            elif isinstance(s, Rect):
+                painter.drawRect(s.x, s.y, s.w, s.h)
+            elif isinstance(s, Contour):
+                painter.drawPolygon(QPolygon([QPoint(int(x), int(y)) for x, y in s.points.reshape(-1, 2)]))
+            elif isinstance(s, Text):
+                font = QFont()
+                font.setPixelSize(max(1, int(HERSHEY_PX * s.scale)))
+                painter.setFont(font)
+                painter.drawText(QPoint(*s.pos), s.text)
+
+
+def main():
+    import sys
+    import time
+
+    import cv2
+    from PyQt5.QtGui import QPixmap
+    from PyQt5.QtWidgets import QApplication, QLabel
+
+    from bench_pyramid import synthetic_frames
+
+    app = QApplication(sys.argv)
+    print("ms per displayed frame (conversion + paint)")
+    print(f"{'resolution':>10s} {'QLabel':>8s} {'VideoWidget':>12s}")
+    for w, h in ((640, 480), (1280, 720), (1920, 1080)):
+        frames = synthetic_frames(60, w, h)
+        label = QLabel()
+        label.setFixedSize(w, h)
+        label.setAlignment(Qt.AlignCenter)
+        label.show()
+        widget = VideoWidget()
+        widget.setFixedSize(w, h)
+        widget.show()
+        app.processEvents()
+
+        t0 = time.perf_counter()
+        for frame in frames:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            qt_img = QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888)
+            label.setPixmap(QPixmap.fromImage(qt_img))
+            label.repaint()
+        before = (time.perf_counter() - t0) * 1000 / len(frames)
+
+        t0 = time.perf_counter()
+        for frame in frames:
+            widget.set_frame(frame)
+            widget.repaint()
+        after = (time.perf_counter() - t0) * 1000 / len(frames)
+        print(f"{w:>5d}x{h:<4d} {before:8.2f} {after:12.2f}")
+        label.close()
+        widget.close()
+
+
+if __name__ == "__main__":
+    main()